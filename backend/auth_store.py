@@ -74,14 +74,22 @@ def set_duo_passcode(task_id: str, code: str):
 _sessions: dict[str, dict] = {}
 
 
+# Shared service-key client, created on first use
+_supabase = None
+
+
 def _get_supabase():
-    """Create a Supabase client using the service key (bypasses RLS)."""
+    """Return a Supabase client using the service key (bypasses RLS)."""
+    global _supabase
+    if _supabase is not None:
+        return _supabase
     url = os.getenv("SUPABASE_URL")
     key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
     if url and key:
         try:
             from supabase import create_client
-            return create_client(url, key)
+            _supabase = create_client(url, key)
+            return _supabase
         except Exception as e:
             logger.warning(f"auth_store: could not create Supabase client: {e}")
     return None
@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import logging
 from fastapi import FastAPI, HTTPException, Query, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
@@ -524,7 +525,7 @@ def start_sync(user_id: str = Depends(get_current_user)):
 def get_sync_status(task_id: str, user_id: str = Depends(get_current_user)):
     """Get the status of a sync task.
 
-    Poll this endpoint every few seconds to track sync progress.
+    One-shot status query; use /sync/stream/{task_id} to follow progress live.
     """
     logger.debug(f"GET /sync/status/{task_id}")
     status = sync_service.get_status(task_id)
@@ -537,6 +538,52 @@ def get_sync_status(task_id: str, user_id: str = Depends(get_current_user)):
     return SyncStatusResponse(**status)
 
 
+@app.get("/sync/stream/{task_id}")
+async def stream_sync_status(task_id: str, user_id: str = Depends(get_current_user)):
+    """Push sync status updates as Server-Sent Events.
+
+    Each SSE event: data: {<same shape as /sync/status>}\n\n
+    The stream closes after the task reaches completed or failed.
+
+    Runs on the event loop: the sync thread hands snapshots over with
+    call_soon_threadsafe, so an open stream doesn't tie up a threadpool worker.
+    """
+    loop = asyncio.get_running_loop()
+    updates: asyncio.Queue = asyncio.Queue()
+
+    def listener(status: dict):
+        try:
+            loop.call_soon_threadsafe(updates.put_nowait, status)
+        except RuntimeError:
+            pass  # event loop already closed (server shutting down)
+
+    if not sync_service.subscribe(task_id, listener):
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    logger.debug(f"GET /sync/stream/{task_id} - subscribed")
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    status = await asyncio.wait_for(updates.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(status)}\n\n"
+                if status["status"] in ("completed", "failed"):
+                    break
+        finally:
+            sync_service.unsubscribe(task_id, listener)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/sync/last")
 def get_last_sync(user_id: str = Depends(get_current_user)):
     """Get the timestamp and summary of the last successful sync."""
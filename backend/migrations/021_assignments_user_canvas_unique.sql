@@ -0,0 +1,11 @@
+-- Migration 021: Per-user unique key on Canvas assignments
+--
+-- Replaces the global partial index on canvas_id (migration 005) with a
+-- (user_id, canvas_id) constraint. PostgREST upserts can only target a
+-- non-partial constraint, and the key matches how canvas_client looks rows up.
+-- Rows with a NULL canvas_id (Learning Suite, manual) never conflict.
+
+DROP INDEX IF EXISTS idx_assignments_canvas_id;
+
+ALTER TABLE assignments
+  ADD CONSTRAINT assignments_user_canvas_id_key UNIQUE (user_id, canvas_id);
@@ -0,0 +1,20 @@
+-- Migration 022: Per-course HTTP validators for Learning Suite gradebook pages
+--
+-- The scraper sends If-None-Match / If-Modified-Since with the stored values;
+-- on a 304 it reuses the cached assignments instead of re-parsing the page.
+
+CREATE TABLE IF NOT EXISTS course_etags (
+    user_id       UUID REFERENCES auth.users(id) ON DELETE CASCADE NOT NULL,
+    course_id     TEXT NOT NULL,
+    etag          TEXT,
+    last_modified TEXT,
+    assignments   JSONB,
+    last_scraped  TIMESTAMPTZ,
+    PRIMARY KEY (user_id, course_id)
+);
+
+ALTER TABLE course_etags ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "own_course_etags" ON course_etags
+    USING (auth.uid() = user_id)
+    WITH CHECK (auth.uid() = user_id);
@@ -0,0 +1,113 @@
+-- Migration 023: upsert_assignments RPC for the Learning Suite scraper
+--
+-- Performs the scraper's whole match / status-transition / insert pass in one
+-- call: supabase.rpc("upsert_assignments", {"payload": rows, "p_user_id": uid}).
+-- Rows are matched on (title, course_name, user_id), mirroring
+-- LearningSuiteScraper.update_database. Returns {"new", "modified", "unchanged", "errors"}.
+
+CREATE OR REPLACE FUNCTION upsert_assignments(payload JSONB, p_user_id UUID DEFAULT NULL)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    item        JSONB;
+    rec         assignments%ROWTYPE;
+    ls_status   TEXT;
+    new_due     TIMESTAMPTZ;
+    changed     BOOLEAN;
+    now_ts      TIMESTAMPTZ := now();
+    n_new       INT := 0;
+    n_modified  INT := 0;
+    n_unchanged INT := 0;
+    n_errors    INT := 0;
+BEGIN
+    FOR item IN SELECT * FROM jsonb_array_elements(payload) LOOP
+        BEGIN
+            ls_status := COALESCE(item->>'status', 'not_started');
+            new_due := (item->>'due_date')::TIMESTAMPTZ;
+
+            SELECT * INTO rec FROM assignments
+             WHERE title = item->>'title'
+               AND course_name = item->>'course_name'
+               AND (p_user_id IS NULL OR user_id = p_user_id)
+             LIMIT 1;
+
+            IF FOUND THEN
+                -- Scraped content changed (separate from is_modified, the user-edit flag)
+                changed := rec.due_date IS DISTINCT FROM new_due
+                        OR rec.description IS DISTINCT FROM item->>'description';
+
+                UPDATE assignments SET
+                    last_scraped_at    = now_ts,
+                    link               = item->>'link',
+                    learning_suite_url = item->>'link',
+                    assignment_type    = item->>'assignment_type',
+                    ls_cid             = item->>'ls_cid',
+                    point_value        = COALESCE((item->>'point_value')::NUMERIC, point_value),
+                    is_extra_credit    = COALESCE((item->>'is_extra_credit')::BOOLEAN, is_extra_credit),
+                    status = CASE
+                        WHEN ls_status = 'submitted' AND rec.status IS DISTINCT FROM 'submitted'
+                            THEN 'submitted'
+                        WHEN ls_status IN ('not_started', 'newly_assigned') AND rec.status = 'submitted'
+                             AND NOT COALESCE(rec.is_modified, FALSE)
+                            THEN 'not_started'
+                        WHEN ls_status = 'not_started' AND rec.status = 'unavailable'
+                            THEN 'not_started'
+                        WHEN ls_status = 'in_progress' AND rec.status IN ('not_started', 'newly_assigned')
+                            THEN 'in_progress'
+                        WHEN ls_status = 'unavailable' AND rec.status IN ('newly_assigned', 'not_started')
+                            THEN 'unavailable'
+                        ELSE rec.status
+                    END,
+                    due_date    = CASE WHEN changed AND new_due IS NOT NULL THEN new_due ELSE due_date END,
+                    description = COALESCE(item->>'description', description)
+                WHERE id = rec.id;
+
+                IF changed THEN
+                    n_modified := n_modified + 1;
+                ELSE
+                    n_unchanged := n_unchanged + 1;
+                END IF;
+            ELSE
+                INSERT INTO assignments (
+                    title, course_name, due_date, description, link, status, source,
+                    is_modified, last_scraped_at, learning_suite_url, assignment_type,
+                    ls_cid, point_value, is_extra_credit, user_id
+                ) VALUES (
+                    item->>'title',
+                    item->>'course_name',
+                    new_due,
+                    item->>'description',
+                    item->>'link',
+                    CASE WHEN ls_status IN ('submitted', 'in_progress', 'unavailable')
+                         THEN ls_status ELSE 'newly_assigned' END,
+                    'learning_suite',
+                    FALSE,
+                    now_ts,
+                    item->>'link',
+                    item->>'assignment_type',
+                    item->>'ls_cid',
+                    (item->>'point_value')::NUMERIC,
+                    COALESCE((item->>'is_extra_credit')::BOOLEAN, FALSE),
+                    p_user_id
+                );
+                n_new := n_new + 1;
+            END IF;
+        EXCEPTION WHEN OTHERS THEN
+            n_errors := n_errors + 1;
+        END;
+    END LOOP;
+
+    RETURN jsonb_build_object(
+        'new', n_new,
+        'modified', n_modified,
+        'unchanged', n_unchanged,
+        'errors', n_errors
+    );
+END;
+$$;
+
+-- The caller chooses p_user_id, so only the backend (service role) may run this;
+-- otherwise any signed-in client could write assignments for another user.
+REVOKE EXECUTE ON FUNCTION upsert_assignments(JSONB, UUID) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION upsert_assignments(JSONB, UUID) TO service_role;
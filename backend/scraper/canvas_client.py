@@ -215,11 +215,14 @@ class CanvasClient:
 
         return "not_started"
 
-    def scrape_all_courses(self, progress_callback=None) -> list[dict]:
+    def scrape_all_courses(self, progress_callback=None, course_done_callback=None) -> list[dict]:
         """Fetch assignments from all active student courses.
 
         Args:
-            progress_callback: Optional fn(current, total, course_name)
+            progress_callback: Optional fn(current, total, course_name), called
+                before each course is fetched
+            course_done_callback: Optional fn(course_name), called once a course's
+                assignments were fetched successfully
 
         Returns:
             Flat list of assignment dicts
@@ -239,6 +242,8 @@ class CanvasClient:
             try:
                 assignments = self.get_assignments(course["id"], course_name)
                 all_assignments.extend(assignments)
+                if course_done_callback:
+                    course_done_callback(course_name)
             except Exception as e:
                 logger.error(f"Canvas: error fetching {course_name}: {e}")
 
@@ -11,9 +11,12 @@ This module handles:
 
 import json
 import os
+import collections
+import functools
 import re
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Optional
 from zoneinfo import ZoneInfo
@@ -47,6 +50,60 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+@functools.lru_cache(maxsize=4096)
+def _clean_description_text(description: str) -> str:
+    """Strip HTML from a description. Cached since course-wide templates repeat."""
+    # First decode HTML entities (&amp; -> &, &#39; -> ', &nbsp; -> space)
+    cleaned = html.unescape(description)
+
+    # Remove HTML tags
+    cleaned = _HTML_TAG_RE.sub('', cleaned)
+
+    # Clean up extra whitespace from removed tags
+    cleaned = _WHITESPACE_RE.sub(' ', cleaned).strip()
+
+    # Truncate if too long
+    if len(cleaned) > 500:
+        cleaned = cleaned[:500] + "..."
+
+    return cleaned
+
+
+class _ProgressThrottle:
+    """Rate-limits progress_callback calls to at most one per interval.
+
+    Runs entirely on the caller's thread: a call is forwarded only if the
+    interval has passed since the last forwarded one, otherwise it is kept as
+    pending and superseded by the next call. flush() delivers the latest pending
+    (current, total, course_name) synchronously.
+    """
+
+    def __init__(self, callback, interval: float = 0.25):
+        self._callback = callback
+        self._interval = interval
+        self._last_emit = None
+        self._pending = None
+
+    def __call__(self, *args):
+        now = time.monotonic()
+        if self._last_emit is not None and now - self._last_emit < self._interval:
+            self._pending = args
+            return
+        self._pending = None
+        self._last_emit = now
+        self._callback(*args)
+
+    def flush(self):
+        """Deliver the pending update now, if any."""
+        args, self._pending = self._pending, None
+        if args is not None:
+            self._last_emit = time.monotonic()
+            self._callback(*args)
+
 
 class LearningSuiteScraper:
     """Scraper for BYU Learning Suite assignments."""
@@ -85,6 +142,12 @@ class LearningSuiteScraper:
     # Default to not_started for safety (unless has_score overrides)
     AMBIGUOUS_BUTTONS = {'view', 'view/submit'}
 
+    # Assignment keys sent to the upsert_assignments RPC
+    RPC_ROW_FIELDS = (
+        "title", "course_name", "due_date", "description", "link",
+        "status", "assignment_type", "ls_cid", "point_value",
+    )
+
     # Session error indicators that suggest we need to re-authenticate
     SESSION_EXPIRED_INDICATORS = [
         "session expired",
@@ -94,6 +157,29 @@ class LearningSuiteScraper:
         "session has ended",
         "authentication required",
     ]
+    # Single case-insensitive pass over the raw page source
+    SESSION_EXPIRED_RE = re.compile(
+        "|".join(map(re.escape, SESSION_EXPIRED_INDICATORS)), re.IGNORECASE
+    )
+
+    # Error page indicators, matched case-insensitively against body text and source
+    ERROR_PAGE_INDICATORS = [
+        "unable to find the page",
+        "page not found",
+        "404",
+        "uh-oh",
+        "error occurred",
+        "something went wrong",
+        "access denied",
+        "not authorized",
+        "maintenance-logo",  # Learning Suite uses this on error pages
+    ]
+    ERROR_PAGE_RE = re.compile(
+        "|".join(map(re.escape, ERROR_PAGE_INDICATORS)), re.IGNORECASE
+    )
+
+    # Duo MFA markers in the login page source
+    DUO_PAGE_RE = re.compile(r"duo-frame|duo_iframe|duosecurity", re.IGNORECASE)
 
     def __init__(self, headless: bool = False, debug: bool = False):
         """Initialize the scraper.
@@ -117,6 +203,11 @@ class LearningSuiteScraper:
         self._session_refresh_count = 0  # Track how many times we've refreshed
         self._max_session_refreshes = 3  # Max refreshes before giving up
         self._http_session = None  # requests.Session built from browser cookies
+        self._per_course_db_totals = collections.Counter()  # DB summary totals from save_per_course
+        self._course_validators = {}  # cid -> stored course_etags row, loaded once per scrape
+        # Debug HTML dumps are written off the scraping thread until close()
+        self._debug_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="debug-io")
+        self._closed = False
         self._setup_supabase()
 
     def _setup_supabase(self):
@@ -222,21 +313,7 @@ class LearningSuiteScraper:
         """
         if not description:
             return description
-
-        # First decode HTML entities (&amp; -> &, &#39; -> ', &nbsp; -> space)
-        cleaned = html.unescape(description)
-
-        # Remove HTML tags
-        cleaned = re.sub(r'<[^>]+>', '', cleaned)
-
-        # Clean up extra whitespace from removed tags
-        cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-
-        # Truncate if too long
-        if len(cleaned) > 500:
-            cleaned = cleaned[:500] + "..."
-
-        return cleaned
+        return _clean_description_text(description)
 
     def _setup_driver(self):
         """Set up Chrome WebDriver."""
@@ -636,13 +713,25 @@ class LearningSuiteScraper:
         Returns:
             HTML text on success, None if request failed or redirected to login.
         """
+        resp = self._http_fetch(url, timeout=timeout)
+        if resp is None or resp.status_code != 200:
+            return None
+        return resp.text
+
+    def _http_fetch(self, url: str, timeout: int = 30, headers: Optional[dict] = None):
+        """GET a URL with the authenticated session and return the raw response.
+
+        Returns:
+            The response for a 200 or 304, None if the request failed or was
+            redirected to login.
+        """
         if not self._http_session:
             self._build_http_session()
         if not self._http_session:
             return None
 
         try:
-            resp = self._http_session.get(url, timeout=timeout, allow_redirects=True)
+            resp = self._http_session.get(url, timeout=timeout, allow_redirects=True, headers=headers)
             final_url = resp.url
 
             # Redirected to auth — session cookies have expired
@@ -653,6 +742,8 @@ class LearningSuiteScraper:
                 logger.warning(f"HTTP: redirected to SSO for {url}")
                 return None
 
+            if resp.status_code == 304:
+                return resp
             if resp.status_code != 200:
                 logger.debug(f"HTTP GET {url} → {resp.status_code}")
                 return None
@@ -667,12 +758,52 @@ class LearningSuiteScraper:
                     logger.info(f"HTTP: session segment updated → {new_base}")
                     self.dynamic_base_url = new_base
 
-            return resp.text
+            return resp
 
         except Exception as e:
             logger.debug(f"HTTP GET error for {url}: {e}")
             return None
 
+    def _load_course_validators(self) -> dict:
+        """Load the stored ETag/Last-Modified rows for all of the user's courses.
+
+        One query per scrape; the per-course fetch looks rows up by cid.
+        Returns an empty dict when nothing has been stored (or no user_id is set).
+        """
+        if not self.supabase or not self.user_id:
+            return {}
+        try:
+            resp = self.supabase.table("course_etags").select("*").eq(
+                "user_id", self.user_id
+            ).execute()
+            return {row["course_id"]: row for row in resp.data or []}
+        except Exception as e:
+            logger.debug(f"Could not load course validators: {e}")
+            return {}
+
+    def _save_course_validators(self, cid: str, resp, assignments: list[dict]):
+        """Store a gradebook response's validators along with its parsed assignments."""
+        if not self.supabase or not self.user_id:
+            return
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        row = {
+            "user_id": self.user_id,
+            "course_id": cid,
+            "etag": etag,
+            "last_modified": last_modified,
+            "assignments": assignments,
+            "last_scraped": datetime.now(timezone.utc).isoformat(),
+        }
+        try:
+            self.supabase.table("course_etags").upsert(row, on_conflict="user_id,course_id").execute()
+            # Keep the in-memory copy current for the retry pass
+            self._course_validators[cid] = row
+        except Exception as e:
+            logger.debug(f"Could not save validators for cid {cid}: {e}")
+
     def _save_debug_html(self, label: str = ""):
         """Save current page source to debug.html for offline analysis.
 
@@ -682,10 +813,22 @@ class LearningSuiteScraper:
         if not self.driver or not self.debug:
             return
         try:
+            # Page source must be read on the driver's thread; only the disk write
+            # is handed to the background pool.
             html = self.driver.page_source
             header = f"<!-- DEBUG DUMP: {label} -->\n<!-- URL: {self.driver.current_url} -->\n<!-- TIME: {datetime.now().isoformat()} -->\n"
+            if self._closed:
+                self._write_debug_html(header + html, label)
+            else:
+                self._debug_pool.submit(self._write_debug_html, header + html, label)
+        except Exception as e:
+            logger.error(f"Failed to save debug HTML: {e}")
+
+    def _write_debug_html(self, content: str, label: str):
+        """Write a captured debug dump to DEBUG_HTML_PATH (runs on the debug-io thread)."""
+        try:
             with open(self.DEBUG_HTML_PATH, "w", encoding="utf-8") as f:
-                f.write(header + html)
+                f.write(content)
             logger.debug(f"Saved debug HTML to {self.DEBUG_HTML_PATH} ({label})")
         except Exception as e:
             logger.error(f"Failed to save debug HTML: {e}")
@@ -722,26 +865,12 @@ class LearningSuiteScraper:
             True if on an error page, False otherwise
         """
         try:
-            page_source = self.driver.page_source.lower()
-            page_text = self.driver.find_element(By.TAG_NAME, "body").text.lower()
-
-            # Check for common error indicators
-            error_indicators = [
-                "unable to find the page",
-                "page not found",
-                "404",
-                "uh-oh",
-                "error occurred",
-                "something went wrong",
-                "access denied",
-                "not authorized",
-                "maintenance-logo",  # Learning Suite uses this on error pages
-            ]
-
-            for indicator in error_indicators:
-                if indicator in page_text or indicator in page_source:
-                    logger.warning(f"Error page detected: found '{indicator}'")
-                    return True
+            # IGNORECASE search avoids lowercased copies of the (often large) page
+            page_text = self.driver.find_element(By.TAG_NAME, "body").text
+            match = self.ERROR_PAGE_RE.search(page_text) or self.ERROR_PAGE_RE.search(self.driver.page_source)
+            if match:
+                logger.warning(f"Error page detected: found '{match.group(0).lower()}'")
+                return True
 
             return False
         except Exception as e:
@@ -774,11 +903,10 @@ class LearningSuiteScraper:
 
             # Check page content for login/session expiry messages
             try:
-                page_source = self.driver.page_source.lower()
-                for indicator in self.SESSION_EXPIRED_INDICATORS:
-                    if indicator in page_source:
-                        logger.warning(f"Session expired - detected '{indicator}' in page")
-                        return False
+                match = self.SESSION_EXPIRED_RE.search(self.driver.page_source)
+                if match:
+                    logger.warning(f"Session expired - detected '{match.group(0)}' in page")
+                    return False
             except Exception:
                 # If we can't read page source, assume session is still valid
                 pass
@@ -1055,9 +1183,7 @@ class LearningSuiteScraper:
                 duo_indicators = [
                     "duosecurity.com" in self.driver.current_url,
                     "duo.com" in self.driver.current_url,
-                    "duo-frame" in self.driver.page_source.lower(),
-                    "duo_iframe" in self.driver.page_source.lower(),
-                    "duosecurity" in self.driver.page_source.lower(),
+                    self.DUO_PAGE_RE.search(self.driver.page_source) is not None,
                 ]
 
                 # Also check for BYU's specific auth pages
@@ -1138,9 +1264,7 @@ class LearningSuiteScraper:
                 logger.error("Login timed out")
                 return False
             except Exception as e:
-                logger.error(f"Login error: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception(f"Login error: {e}")
                 return False
         else:
             # Already logged in (session still active)
@@ -1333,9 +1457,7 @@ class LearningSuiteScraper:
             return courses
 
         except Exception as e:
-            logger.error(f"Error extracting courses: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"Error extracting courses: {e}")
             return courses
 
     def _extract_opens_date(self, text: str) -> Optional[str]:
@@ -1559,6 +1681,16 @@ class LearningSuiteScraper:
         # The embedded `var assignments = [...]` JS is in the server-rendered HTML,
         # so we don't need the browser to execute any JavaScript.
         # Typical speed: ~0.3-1s per course vs ~3-5s for Selenium navigation.
+        # If the gradebook is unchanged since the last sync (ETag/Last-Modified),
+        # LS answers 304 and the previous parse is reused without re-parsing.
+        validators = self._course_validators.get(cid)
+        conditional_headers = {}
+        if validators and validators.get("assignments"):
+            if validators.get("etag"):
+                conditional_headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                conditional_headers["If-Modified-Since"] = validators["last_modified"]
+
         gradebook_paths = [
             f"/cid-{cid}/student/gradebook/assignments",
             f"/cid-{cid}/student/gradebook",
@@ -1567,14 +1699,19 @@ class LearningSuiteScraper:
         for path in gradebook_paths:
             # Try session-prefixed URL first (most direct), then bare cid- URL
             for fetch_url in [f"{base_url}{path}", f"{self.LEARNING_SUITE_URL}{path}"]:
-                html_text = self._http_get(fetch_url)
-                if html_text:
-                    js_assignments = self._extract_js_assignments(html_text, course_name, cid)
-                    if js_assignments:
-                        logger.info(f"[HTTP] {course_name}: {len(js_assignments)} assignments")
-                        return js_assignments
-                    # Got HTML but no JS data — no point trying the bare URL
-                    break
+                resp = self._http_fetch(fetch_url, headers=conditional_headers or None)
+                if resp is None:
+                    continue
+                if resp.status_code == 304:
+                    logger.info(f"[HTTP] {course_name}: unchanged since last sync (304)")
+                    return validators["assignments"]
+                js_assignments = self._extract_js_assignments(resp.text, course_name, cid)
+                if js_assignments:
+                    logger.info(f"[HTTP] {course_name}: {len(js_assignments)} assignments")
+                    self._save_course_validators(cid, resp, js_assignments)
+                    return js_assignments
+                # Got HTML but no JS data — no point trying the bare URL
+                break
 
         logger.debug(f"HTTP fast path: no embedded JS for {course_name}, falling back to Selenium")
 
@@ -1605,9 +1742,7 @@ class LearningSuiteScraper:
         try:
             assignments = self._parse_grades_assignments_grid(course_name, cid)
         except Exception as e:
-            logger.debug(f">>> ERROR parsing grades grid: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"Error parsing grades grid for {course_name}: {e}")
 
         logger.debug(f"\n>>> GRADES → ASSIGNMENTS COMPLETE: {len(assignments)} assignments found")
         logger.debug("-" * 70)
@@ -3196,6 +3331,75 @@ class LearningSuiteScraper:
         logger.debug(f"           [DATE PARSE FAILED] Could not parse: '{original_str}'")
         return None
 
+    def _scrape_one_course(self, course: dict, save_per_course: bool) -> tuple[list[dict], bool]:
+        """Scrape a single course's Grades view plus Exams tab.
+
+        Shared by the primary pass and the retry pass of scrape_all_courses().
+        Session checks and keep-alives stay with the caller since they depend
+        on the course's position in the run.
+
+        Args:
+            course: Course dict with 'name' and 'cid'
+            save_per_course: If True, write this course's assignments to the DB
+
+        Returns:
+            Tuple of (course_assignments, needs_retry). needs_retry is True when
+            the session expired mid-course and could not be recovered.
+        """
+        course_assignments = []
+        existing_titles = set()
+
+        # PRIMARY SOURCE: Grades -> Assignments view
+        # This should contain ALL gradable items including quizzes, exams, projects, etc.
+        try:
+            grades_assignments = self.scrape_grades_assignments_view(course)
+        except Exception as e:
+            logger.error(f"Error scraping grades view for {course['name']}: {e}")
+            grades_assignments = []
+            # Check if this was a session error
+            if not self._check_session_valid():
+                logger.warning(f"Session expired during {course['name']}, attempting refresh...")
+                if not self._refresh_session():
+                    return [], True
+                # Retry this course after session refresh
+                try:
+                    grades_assignments = self.scrape_grades_assignments_view(course)
+                except Exception as retry_e:
+                    logger.error(f"Retry failed for {course['name']}: {retry_e}")
+                    return [], True
+
+        for a in grades_assignments:
+            course_assignments.append(a)
+            existing_titles.add(a["title"])
+
+        # SECONDARY: Always scrape the Exams tab — exams are kept in a separate
+        # section from gradeable assignments and are routinely missed if we only
+        # look at the Grades view.  Deduplicate by title so nothing appears twice.
+        try:
+            exams_assignments = self.scrape_exams_tab(course)
+            new_exams = 0
+            for exam in exams_assignments:
+                if exam["title"] not in existing_titles:
+                    course_assignments.append(exam)
+                    existing_titles.add(exam["title"])
+                    new_exams += 1
+                    logger.debug(f"    [NEW FROM EXAMS] {exam['title']}")
+            if new_exams:
+                logger.info(f"Exams tab added {new_exams} item(s) for {course['name']}")
+        except Exception as e:
+            logger.error(f"Error scraping exams tab for {course['name']}: {e}")
+
+        logger.debug(f"\n>>> COURSE COMPLETE: {course['name']}")
+        logger.debug(f">>> Total assignments found: {len(course_assignments)}")
+
+        # Save this course's assignments to DB immediately if requested
+        if save_per_course and course_assignments:
+            db_result = self.update_database(course_assignments)
+            if "error" not in db_result:
+                self._per_course_db_totals.update(db_result)
+
+        return course_assignments, False
+
     def scrape_all_courses(self, progress_callback=None, save_per_course=False) -> list[dict]:
         """Scrape assignments from all enrolled courses.
 
@@ -3224,21 +3428,23 @@ class LearningSuiteScraper:
             logger.warning("No courses found to scrape")
             return all_assignments
 
+        # Stored gradebook validators for conditional requests, fetched in one query
+        self._course_validators = self._load_course_validators()
+
         total_courses = len(courses)
         if progress_callback:
+            progress_callback = _ProgressThrottle(progress_callback)
             progress_callback(0, total_courses, "Starting...")
 
-        # Track totals per course for summary
-        course_totals = {}
-        # Track per-course DB results when save_per_course is enabled
-        self._per_course_db_results = []
+        # (course_name, course_assignments) per finished course, primary and retry
+        # passes alike; totals and the flat list are built from this once at the end
+        course_results = []
+        # Running new/modified/unchanged/errors totals when save_per_course is enabled
+        self._per_course_db_totals = collections.Counter()
         # Track failed courses for potential retry
         failed_courses = []
 
         for i, course in enumerate(courses):
-            course_assignments = []
-            existing_titles = set()
-
             logger.debug(f"\n{'#' * 70}")
             logger.debug(f"### PROCESSING COURSE: {course['name']} ({i+1}/{total_courses})")
             logger.debug(f"{'#' * 70}")
@@ -3266,64 +3472,14 @@ class LearningSuiteScraper:
             if i > 0 and i % 3 == 0:
                 self._keepalive()
 
-            # PRIMARY SOURCE: Grades -> Assignments view
-            # This should contain ALL gradable items including quizzes, exams, projects, etc.
-            grades_assignments = []
-            try:
-                grades_assignments = self.scrape_grades_assignments_view(course)
-                for a in grades_assignments:
-                    course_assignments.append(a)
-                    existing_titles.add(a["title"])
-            except Exception as e:
-                logger.error(f"Error scraping grades view for {course['name']}: {e}")
-                # Check if this was a session error
-                if not self._check_session_valid():
-                    logger.warning(f"Session expired during {course['name']}, attempting refresh...")
-                    if self._refresh_session():
-                        # Retry this course after session refresh
-                        try:
-                            grades_assignments = self.scrape_grades_assignments_view(course)
-                            for a in grades_assignments:
-                                course_assignments.append(a)
-                                existing_titles.add(a["title"])
-                        except Exception as retry_e:
-                            logger.error(f"Retry failed for {course['name']}: {retry_e}")
-                            failed_courses.append((i, course))
-                    else:
-                        failed_courses.append((i, course))
-                        if progress_callback:
-                            progress_callback(i + 1, total_courses, f"{course['name']} (failed)")
-                        continue
-
-            # SECONDARY: Always scrape the Exams tab — exams are kept in a separate
-            # section from gradeable assignments and are routinely missed if we only
-            # look at the Grades view.  Deduplicate by title so nothing appears twice.
-            try:
-                exams_assignments = self.scrape_exams_tab(course)
-                new_exams = 0
-                for exam in exams_assignments:
-                    if exam["title"] not in existing_titles:
-                        course_assignments.append(exam)
-                        existing_titles.add(exam["title"])
-                        new_exams += 1
-                        logger.debug(f"    [NEW FROM EXAMS] {exam['title']}")
-                if new_exams:
-                    logger.info(f"Exams tab added {new_exams} item(s) for {course['name']}")
-            except Exception as e:
-                logger.error(f"Error scraping exams tab for {course['name']}: {e}")
-
-            # Track course total
-            course_totals[course['name']] = len(course_assignments)
-
-            logger.debug(f"\n>>> COURSE COMPLETE: {course['name']}")
-            logger.debug(f">>> Total assignments found: {len(course_assignments)}")
-
-            # Save this course's assignments to DB immediately if requested
-            if save_per_course and course_assignments:
-                db_result = self.update_database(course_assignments)
-                self._per_course_db_results.append(db_result)
+            course_assignments, needs_retry = self._scrape_one_course(course, save_per_course)
+            if needs_retry:
+                failed_courses.append((i, course))
+                if progress_callback:
+                    progress_callback(i + 1, total_courses, f"{course['name']} (failed)")
+                continue
 
-            all_assignments.extend(course_assignments)
+            course_results.append((course['name'], course_assignments))
 
             # Report progress after each course
             if progress_callback:
@@ -3338,46 +3494,24 @@ class LearningSuiteScraper:
 
             # First, try to refresh the session
             if self._check_session_valid() or self._refresh_session():
-                for original_idx, course in failed_courses:
+                for _, course in failed_courses:
                     logger.debug(f"\n### RETRY: {course['name']}")
-                    course_assignments = []
-                    existing_titles = set()
 
                     if not self._check_session_valid():
                         logger.error(f"Session still invalid, skipping retry for {course['name']}")
                         continue
 
-                    try:
-                        grades_assignments = self.scrape_grades_assignments_view(course)
-                        for a in grades_assignments:
-                            course_assignments.append(a)
-                            existing_titles.add(a["title"])
-
-                        try:
-                            exams_assignments = self.scrape_exams_tab(course)
-                            for exam in exams_assignments:
-                                if exam["title"] not in existing_titles:
-                                    course_assignments.append(exam)
-                                    existing_titles.add(exam["title"])
-                        except Exception:
-                            pass
-
-                        course_totals[course['name']] = len(course_assignments)
-                        logger.debug(f">>> RETRY COMPLETE: {course['name']} - {len(course_assignments)} assignments")
-
-                        if save_per_course and course_assignments:
-                            db_result = self.update_database(course_assignments)
-                            self._per_course_db_results.append(db_result)
-
-                        all_assignments.extend(course_assignments)
-
-                    except Exception as e:
-                        logger.error(f"Retry failed for {course['name']}: {e}")
-                        course_totals[course['name']] = 0
+                    course_assignments, _ = self._scrape_one_course(course, save_per_course)
+                    course_results.append((course['name'], course_assignments))
             else:
                 logger.error("Cannot refresh session for retry, skipping failed courses")
                 for _, course in failed_courses:
-                    course_totals[course['name']] = 0
+                    course_results.append((course['name'], []))
+
+        course_totals = {}
+        for course_name, course_assignments in course_results:
+            course_totals[course_name] = len(course_assignments)
+            all_assignments += course_assignments
 
         # Print final summary with totals per course
         logger.debug("\n" + "=" * 70)
@@ -3394,6 +3528,15 @@ class LearningSuiteScraper:
         logger.debug("-" * 70)
         logger.debug(f"  TOTAL: {len(all_assignments)} assignments")
         logger.debug("=" * 70)
+        if save_per_course:
+            db_totals = self._per_course_db_totals
+            logger.info(
+                f"Saved per course: {db_totals['new']} new, {db_totals['modified']} modified, "
+                f"{db_totals['unchanged']} unchanged, {db_totals['errors']} errors"
+            )
+
+        if progress_callback:
+            progress_callback.flush()
 
         logger.info(f"Total assignments scraped: {len(all_assignments)}")
         return all_assignments
@@ -3411,21 +3554,21 @@ class LearningSuiteScraper:
             logger.error("Supabase client not initialized")
             return {"error": "Database not connected"}
 
-        summary = {"new": 0, "modified": 0, "unchanged": 0, "errors": 0}
-        now = datetime.now(timezone.utc).isoformat()
-
         logger.debug("\n" + "=" * 70)
         logger.info("Updating database...")
         logger.debug(f">>> Total assignments to process: {len(assignments)}")
         logger.debug("=" * 70)
 
-        for i, assignment in enumerate(assignments):
+        # Normalize each row on its own so one bad row counts as an error instead
+        # of aborting the whole update
+        normalized = []
+        normalize_errors = 0
+        for assignment in assignments:
             try:
                 # Sanitize URL to remove session segment (prevents error pages)
                 raw_link = assignment.get("link")
                 cid = assignment.get("ls_cid")
-                sanitized_link = self._sanitize_url(raw_link, cid=cid) if raw_link else None
-                assignment["link"] = sanitized_link
+                assignment["link"] = self._sanitize_url(raw_link, cid=cid) if raw_link else None
 
                 # Clean description (remove HTML tags and entities)
                 raw_desc = assignment.get("description")
@@ -3433,15 +3576,53 @@ class LearningSuiteScraper:
                     assignment["description"] = self._clean_description(raw_desc)
 
                 # Clean title (remove HTML entities like &amp;)
-                raw_title = assignment.get("title", "")
-                assignment["title"] = html.unescape(raw_title)
+                assignment["title"] = html.unescape(assignment.get("title", ""))
+                normalized.append(assignment)
+            except Exception as e:
+                logger.error(f"Error normalizing assignment '{assignment.get('title')}': {e}")
+                normalize_errors += 1
+
+        # Fast path: one round-trip through the upsert_assignments RPC (migration 023),
+        # which applies the same matching and status rules as _update_database_rows.
+        rows = []
+        for assignment in normalized:
+            row = {key: assignment.get(key) for key in self.RPC_ROW_FIELDS}
+            if "is_extra_credit" in assignment:
+                row["is_extra_credit"] = assignment["is_extra_credit"]
+            rows.append(row)
+        summary = None
+        try:
+            resp = self.supabase.rpc(
+                "upsert_assignments", {"payload": rows, "p_user_id": self.user_id}
+            ).execute()
+            if isinstance(resp.data, dict) and "new" in resp.data:
+                summary = resp.data
+            else:
+                logger.warning(f"upsert_assignments RPC returned unexpected data, falling back to per-row updates: {resp.data!r}")
+        except Exception as e:
+            logger.warning(f"upsert_assignments RPC failed, falling back to per-row updates: {e}")
+
+        if summary is None:
+            summary = self._update_database_rows(normalized)
+        else:
+            logger.debug(f">>> DATABASE UPDATE COMPLETE (rpc): {summary}")
+        summary["errors"] = summary.get("errors", 0) + normalize_errors
+        return summary
+
+    def _update_database_rows(self, assignments: list[dict]) -> dict:
+        """Per-row SELECT-then-UPDATE/INSERT fallback for update_database().
+
+        Expects assignments already normalized by update_database().
+        """
+        summary = {"new": 0, "modified": 0, "unchanged": 0, "errors": 0}
+        now = datetime.now(timezone.utc).isoformat()
 
+        for i, assignment in enumerate(assignments):
+            try:
                 logger.debug(f"\n--- DB Update {i+1}/{len(assignments)} ---")
                 logger.debug(f"    Title: '{assignment['title']}'")
                 logger.debug(f"    Course: '{assignment['course_name']}'")
                 logger.debug(f"    Status: '{assignment.get('status')}'")
-                if raw_link != sanitized_link:
-                    logger.debug(f"    Link (sanitized): {sanitized_link}")
 
                 # Check if assignment exists (match by title + course_name + user_id)
                 query = self.supabase.table("assignments").select("*").eq(
@@ -3665,9 +3846,7 @@ class LearningSuiteScraper:
             result["error"] = "Scraping interrupted by user"
             logger.info("Scraping interrupted by user")
         except Exception as e:
-            logger.error(f"Scraper error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"Scraper error: {e}")
             result["error"] = str(e)
             self._save_debug_html("scraper_exception")
 
@@ -3677,8 +3856,10 @@ class LearningSuiteScraper:
         return result
 
     def close(self):
-        """Close the browser."""
+        """Close the browser and flush any pending debug writes."""
         if self.driver:
             self.driver.quit()
             self.driver = None
             logger.info("Browser closed")
+        self._closed = True
+        self._debug_pool.shutdown(wait=True)
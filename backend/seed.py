@@ -134,6 +134,21 @@ ASSIGNMENTS = [
     },
 ]
 
+# Columns the app lets users edit. The upsert only writes the columns it is given,
+# so they are sent with their defaults to reset the demo rows like the old
+# delete + insert did.
+USER_EDITABLE_DEFAULTS = {
+    "is_modified": False,
+    "estimated_minutes": None,
+    "planned_start": None,
+    "planned_end": None,
+    "notes": None,
+    "submitted_at": None,
+    "task_type": "assignment",
+    "content_type": "graded",
+    "classification_confirmed": True,
+}
+
 
 def get_user_id(email: str) -> str:
     """Look up user_id from Supabase Auth by email."""
@@ -153,11 +168,11 @@ def get_user_id(email: str) -> str:
 def seed_database(user_id: str):
     print(f"Seeding demo assignments for user {user_id[:8]}...")
 
-    # Clear existing demo assignments (canvas_id 900001-900010)
-    supabase.table("assignments").delete().gte("canvas_id", 900001).lte("canvas_id", 900010).execute()
-
+    # Single upsert keyed on (user_id, canvas_id) so re-running resets the demo rows
+    # instead of duplicating them (requires migration 021)
+    rows = [{**USER_EDITABLE_DEFAULTS, **a, "user_id": user_id} for a in ASSIGNMENTS]
+    supabase.table("assignments").upsert(rows, on_conflict="user_id,canvas_id").execute()
     for a in ASSIGNMENTS:
-        supabase.table("assignments").insert({**a, "user_id": user_id}).execute()
         print(f"  Added: {a['title']}")
 
     print(f"\nDone! Added {len(ASSIGNMENTS)} demo assignments.")
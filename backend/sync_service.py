@@ -4,12 +4,15 @@ Canvas Sync Service
 Orchestrates Canvas assignment sync with thread-safe status tracking for polling.
 """
 
+import atexit
 import os
 import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from enum import Enum
-from typing import Optional
+from typing import Callable, Final, Optional
 import logging
 
 from dotenv import load_dotenv
@@ -22,35 +25,61 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 
-class SyncStatus(str, Enum):
-    """Status states for the sync process."""
-    PENDING = "pending"
-    CHECKING_SESSION = "checking_session"
-    WAITING_FOR_MFA = "waiting_for_mfa"
-    SCRAPING = "scraping"
-    UPDATING_DB = "updating_db"
-    COMPLETED = "completed"
-    FAILED = "failed"
+class _TaskLogAdapter(logging.LoggerAdapter):
+    """Logger bound to one sync task.
+
+    Prefixes messages with ``Sync [<tid>] -`` and attaches ``tid`` to each record
+    so handlers can filter by task. The root format is shared with other modules,
+    so the prefix is added here rather than via a ``%(tid)s`` format string.
+    """
+
+    def process(self, msg, kwargs):
+        kwargs.setdefault("extra", self.extra)
+        return f"{self.extra['prefix']}{msg}", kwargs
+
+
+class SyncStatus:
+    """Status states for the sync process.
+
+    Plain string constants rather than an Enum: task.status is serialized on every
+    status read and SSE push, and a str needs no .value lookup.
+    """
+    PENDING: Final = "pending"
+    CHECKING_SESSION: Final = "checking_session"
+    WAITING_FOR_MFA: Final = "waiting_for_mfa"
+    SCRAPING: Final = "scraping"
+    UPDATING_DB: Final = "updating_db"
+    COMPLETED: Final = "completed"
+    FAILED: Final = "failed"
 
 
 class SyncTask:
     """Represents a single sync task with its state."""
 
     def __init__(self, task_id: str, user_id: str):
+        # Guards the mutable progress fields below and _subscribers
+        self._lock = threading.Lock()
+        # SSE listeners: each is called with a status snapshot after every change
+        self._subscribers: list[Callable[[dict], None]] = []
         self.task_id = task_id
         self.user_id = user_id
-        self.status = SyncStatus.PENDING
+        self.status: str = SyncStatus.PENDING
         self.message = "Initializing sync..."
         self.error: Optional[str] = None
         self.warnings: list[str] = []
         self.started_at = datetime.now(timezone.utc)
         self.completed_at: Optional[datetime] = None
+        # ISO strings are formatted once at write time; status reads just copy them
+        self.started_at_iso = self.started_at.isoformat()
+        self.completed_at_iso: Optional[str] = None
         self.assignments_added = 0
         self.assignments_updated = 0
         self.courses_scraped = 0
         self.total_courses = 0
         self.current_course = 0
         self.current_course_name = ""
+        short_id = task_id[:8]
+        self.log = _TaskLogAdapter(logger, {"tid": short_id, "prefix": f"Sync [{short_id}] - "})
 
 
 class SyncService:
@@ -59,6 +88,22 @@ class SyncService:
     _instance = None
     _lock = threading.Lock()
 
+    # Finished tasks are kept for status polling; only the most recent are retained
+    MAX_TASKS = 64
+
+    # /sync/last cache: most recent users only, and DB-read rows expire so writes
+    # from other processes show up
+    LAST_SYNC_CACHE_SIZE = 256
+    LAST_SYNC_CACHE_TTL = 60  # seconds
+
+    # Warm CanvasClients (each holds a session + bearer token) kept for recent users
+    MAX_CANVAS_CLIENTS = 16
+
+    # sync_metadata rows are buffered and inserted in batches of this size, or
+    # after METADATA_FLUSH_SECONDS, whichever comes first
+    METADATA_BATCH_SIZE = 50
+    METADATA_FLUSH_SECONDS = 300
+
     def __new__(cls):
         """Singleton pattern to ensure only one sync service exists."""
         if cls._instance is None:
@@ -72,13 +117,32 @@ class SyncService:
         if self._initialized:
             return
         self._initialized = True
-        self._tasks: dict[str, SyncTask] = {}
+        self._tasks: OrderedDict[str, SyncTask] = OrderedDict()
         self._current_task_id: Optional[str] = None
+        # Guards _tasks and _current_task_id only; task fields use task._lock.
+        # If both are ever needed, take _task_lock first.
         self._task_lock = threading.Lock()
+        # Latest sync_metadata row per user: user_id -> (expires_at, row). Refreshed on
+        # every write so polling /sync/last doesn't hit Supabase. expires_at is None
+        # while the row is still waiting in _metadata_buffer (the DB doesn't have it yet).
+        self._last_sync_cache: OrderedDict[str, tuple[Optional[float], dict]] = OrderedDict()
+        self._last_sync_cache_lock = threading.Lock()
+        # Warm CanvasClient per user so repeat syncs reuse pooled HTTPS connections;
+        # LRU-bounded by MAX_CANVAS_CLIENTS
+        self._canvas_clients: OrderedDict = OrderedDict()
+        self._canvas_clients_lock = threading.Lock()
+        # sync_metadata inserts run here so they don't delay task completion
+        self._metadata_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sync-meta")
+        self._metadata_buffer: list[dict] = []
+        self._metadata_timer: Optional[threading.Timer] = None
+        self._metadata_lock = threading.Lock()
+        atexit.register(self._flush_sync_metadata)
         self._setup_supabase()
 
     def _setup_supabase(self):
         """Set up Supabase client using service role key so RLS doesn't block writes."""
+        if getattr(self, "supabase", None) is not None:
+            return
         url = os.getenv("SUPABASE_URL")
         # Prefer service key — bypasses RLS so sync can write for any user
         key = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_KEY")
@@ -98,15 +162,18 @@ class SyncService:
             # Check if a sync is already in progress
             if self._current_task_id:
                 current_task = self._tasks.get(self._current_task_id)
-                if current_task and current_task.status not in [SyncStatus.COMPLETED, SyncStatus.FAILED]:
+                if current_task and current_task.status not in (SyncStatus.COMPLETED, SyncStatus.FAILED):
                     # Auto-expire syncs that have been running for more than 10 minutes —
                     # this handles crashes/hangs that leave _current_task_id set forever.
                     elapsed = (datetime.now(timezone.utc) - current_task.started_at).total_seconds()
                     if elapsed > 600:
-                        logger.warning(f"Sync [{self._current_task_id[:8]}] appears stuck ({elapsed:.0f}s), force-expiring")
-                        current_task.status = SyncStatus.FAILED
-                        current_task.error = "Sync timed out after 10 minutes"
-                        current_task.completed_at = datetime.now(timezone.utc)
+                        current_task.log.warning("appears stuck (%.0fs), force-expiring", elapsed)
+                        with current_task._lock:
+                            current_task.status = SyncStatus.FAILED
+                            current_task.error = "Sync timed out after 10 minutes"
+                            current_task.completed_at = datetime.now(timezone.utc)
+                            current_task.completed_at_iso = current_task.completed_at.isoformat()
+                            self._publish(current_task)
                         self._current_task_id = None
                     else:
                         return "", "Sync already in progress"
@@ -116,6 +183,7 @@ class SyncService:
             task = SyncTask(task_id, user_id)
             self._tasks[task_id] = task
             self._current_task_id = task_id
+            self._evict_old_tasks()
 
         # Start sync in background thread
         thread = threading.Thread(target=self._run_sync, args=(task_id, user_id), daemon=True)
@@ -132,18 +200,28 @@ class SyncService:
         Returns:
             Dict with status info, or None if task not found
         """
-        task = self._tasks.get(task_id)
-        if not task:
-            return None
+        with self._task_lock:
+            task = self._tasks.get(task_id)
+            if not task:
+                return None
+            self._tasks.move_to_end(task_id)
+
+        with task._lock:
+            return self._snapshot(task)
 
+    def _snapshot(self, task: SyncTask) -> dict:
+        """Serialize a task's current state for the status API and SSE stream.
+
+        Caller holds task._lock.
+        """
         return {
             "task_id": task.task_id,
-            "status": task.status.value,
+            "status": task.status,
             "message": task.message,
             "error": task.error,
-            "warnings": task.warnings,
-            "started_at": task.started_at.isoformat(),
-            "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+            "warnings": list(task.warnings),
+            "started_at": task.started_at_iso,
+            "completed_at": task.completed_at_iso,
             "assignments_added": task.assignments_added,
             "assignments_updated": task.assignments_updated,
             "courses_scraped": task.courses_scraped,
@@ -152,6 +230,55 @@ class SyncService:
             "current_course_name": task.current_course_name,
         }
 
+    def subscribe(self, task_id: str, listener: Callable[[dict], None]) -> bool:
+        """Register an SSE listener for a task.
+
+        The listener is called with the current status right away and then with a
+        fresh status dict after every change. It runs on the sync thread while the
+        task lock is held, so it must only hand the dict off (e.g. to an event loop).
+
+        Returns:
+            False if the task is unknown, True otherwise
+        """
+        with self._task_lock:
+            task = self._tasks.get(task_id)
+        if not task:
+            return False
+        with task._lock:
+            listener(self._snapshot(task))
+            task._subscribers.append(listener)
+        return True
+
+    def unsubscribe(self, task_id: str, listener: Callable[[dict], None]):
+        """Remove an SSE listener registered with subscribe()."""
+        with self._task_lock:
+            task = self._tasks.get(task_id)
+        if not task:
+            return
+        with task._lock:
+            if listener in task._subscribers:
+                task._subscribers.remove(listener)
+
+    def _publish(self, task: SyncTask):
+        """Push the task's status to its SSE listeners. Caller holds task._lock."""
+        if not task._subscribers:
+            return
+        snapshot = self._snapshot(task)
+        for listener in task._subscribers:
+            listener(snapshot)
+
+    def _evict_old_tasks(self):
+        """Drop least-recently-used tasks beyond MAX_TASKS. Caller holds _task_lock."""
+        excess = len(self._tasks) - self.MAX_TASKS
+        if excess <= 0:
+            return
+        for task_id in list(self._tasks):
+            if excess <= 0:
+                break
+            if task_id != self._current_task_id:
+                del self._tasks[task_id]
+                excess -= 1
+
     def get_last_sync(self, user_id: str) -> Optional[dict]:
         """Get the last sync metadata from the database for a specific user.
 
@@ -161,6 +288,11 @@ class SyncService:
         if not self.supabase:
             return None
 
+        with self._last_sync_cache_lock:
+            cached = self._cached_last_sync(user_id)
+        if cached is not None:
+            return cached
+
         try:
             response = self.supabase.table("sync_metadata").select("*").eq(
                 "user_id", user_id
@@ -169,185 +301,377 @@ class SyncService:
             ).limit(1).execute()
 
             if response.data:
+                with self._last_sync_cache_lock:
+                    # A sync that finished mid-query has already cached a newer row
+                    cached = self._cached_last_sync(user_id)
+                    if cached is not None:
+                        return cached
+                    self._cache_last_sync(user_id, response.data[0])
                 return response.data[0]
             return None
         except Exception as e:
             logger.error(f"Error fetching last sync: {e}")
             return None
 
-    def _update_task(self, task_id: str, status: SyncStatus, message: str):
+    def _cached_last_sync(self, user_id: str) -> Optional[dict]:
+        """Cached sync_metadata row for a user, or None if missing/expired.
+
+        Caller holds _last_sync_cache_lock.
+        """
+        entry = self._last_sync_cache.get(user_id)
+        if entry is None:
+            return None
+        expires_at, row = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._last_sync_cache[user_id]
+            return None
+        self._last_sync_cache.move_to_end(user_id)
+        return row
+
+    def _cache_last_sync(self, user_id: str, row: dict, pending: bool = False):
+        """Cache a user's latest sync_metadata row, evicting the least recently used.
+
+        pending rows (not yet inserted) don't expire until their batch is flushed.
+        Caller holds _last_sync_cache_lock.
+        """
+        expires_at = None if pending else time.monotonic() + self.LAST_SYNC_CACHE_TTL
+        self._last_sync_cache[user_id] = (expires_at, row)
+        self._last_sync_cache.move_to_end(user_id)
+        while len(self._last_sync_cache) > self.LAST_SYNC_CACHE_SIZE:
+            self._last_sync_cache.popitem(last=False)
+
+    def _update_task(self, task_id: str, status: str, message: str):
         """Update task status thread-safely."""
         with self._task_lock:
             task = self._tasks.get(task_id)
-            if task:
+        if task:
+            with task._lock:
                 task.status = status
                 task.message = message
-                logger.info(f"Sync [{task_id[:8]}]: {status.value} - {message}")
+                self._publish(task)
+            task.log.info("%s - %s", status, message)
 
     def _run_sync(self, task_id: str, user_id: str):
         """Run Canvas sync in a background thread."""
-        task = self._tasks.get(task_id)
+        with self._task_lock:
+            task = self._tasks.get(task_id)
         if not task:
             return
 
-        canvas_token = canvas_auth_store.get_token(user_id)
+        try:
+            canvas_token = canvas_auth_store.get_token(user_id)
+
+            # Check whether there is anything to sync (Canvas token or iCal feeds).
+            # The feed rows fetched here are reused by the iCal sync.
+            ical_feeds = []
+            if self.supabase:
+                try:
+                    feeds_resp = self.supabase.table("ls_ical_feeds").select("*").eq(
+                        "user_id", user_id
+                    ).execute()
+                    ical_feeds = feeds_resp.data or []
+                except Exception:
+                    pass
+            has_ical_feeds = bool(ical_feeds)
+
+            if not canvas_token and not has_ical_feeds:
+                with task._lock:
+                    task.status = SyncStatus.FAILED
+                    task.error = "Nothing to sync. Connect Canvas or add an iCal feed in Settings."
+                    task.message = f"Sync failed: {task.error}"
+                    task.completed_at = datetime.now(timezone.utc)
+                    task.completed_at_iso = task.completed_at.isoformat()
+                    self._publish(task)
+                self._save_sync_metadata(task_id, user_id, "failed", None, task.error, end_ts=task.completed_at)
+                return
 
-        # Check whether there is anything to sync (Canvas token or iCal feeds)
-        has_ical_feeds = False
-        if self.supabase:
             try:
-                feeds_resp = self.supabase.table("ls_ical_feeds").select("id").eq(
-                    "user_id", user_id
-                ).limit(1).execute()
-                has_ical_feeds = bool(feeds_resp.data)
-            except Exception:
-                pass
-
-        if not canvas_token and not has_ical_feeds:
-            with self._task_lock:
-                task.status = SyncStatus.FAILED
-                task.error = "Nothing to sync. Connect Canvas or add an iCal feed in Settings."
-                task.message = f"Sync failed: {task.error}"
-                task.completed_at = datetime.now(timezone.utc)
-            self._save_sync_metadata(task_id, user_id, "failed", None, task.error)
-            return
+                # Canvas (REST API) and LS iCal feeds touch disjoint services, so run
+                # them side by side; wall time becomes max(canvas, ical) rather than the sum.
+                sources = []
+                if canvas_token:
+                    sources.append("Canvas assignments")
+                if has_ical_feeds:
+                    sources.append("Learning Suite iCal feeds")
+                self._update_task(task_id, SyncStatus.SCRAPING, f"Syncing {' and '.join(sources)}...")
+
+                with ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"sync-{task_id[:8]}") as pool:
+                    futures = []
+                    if canvas_token:
+                        futures.append(pool.submit(self._run_canvas_sync, task, user_id, canvas_token))
+                    if has_ical_feeds:
+                        futures.append(pool.submit(self._run_ical_sync, task, user_id, ical_feeds))
+
+                    # A Canvas failure propagates and fails the whole sync, as before;
+                    # iCal feed errors are already downgraded to warnings per feed.
+                    # Totals are summed locally and written in the completion block below.
+                    total_added = total_updated = total_courses = 0
+                    for future in as_completed(futures):
+                        added, updated, courses = future.result()
+                        total_added += added
+                        total_updated += updated
+                        total_courses += courses
+
+                # One sync-end timestamp shared by the task and its sync_metadata row
+                end_ts = datetime.now(timezone.utc)
+
+                # Build result summary for metadata
+                result = {
+                    "courses_scraped": total_courses,
+                    "assignments_added": total_added,
+                    "assignments_updated": total_updated,
+                }
 
-        try:
-            # ---- Canvas sync ----
-            if canvas_token:
-                self._update_task(task_id, SyncStatus.SCRAPING, "Fetching Canvas assignments...")
-                logger.info(f"Sync [{task_id[:8]}] - Starting Canvas sync...")
+                self._save_sync_metadata(task_id, user_id, "success", result, end_ts=end_ts)
+
+                # Finish the task in a single locked region
+                with task._lock:
+                    task.assignments_added = total_added
+                    task.assignments_updated = total_updated
+                    task.courses_scraped = total_courses
+                    task.status = SyncStatus.COMPLETED
+                    task.message = f"Sync complete! {total_added} new, {total_updated} updated from {total_courses} courses."
+                    task.completed_at = end_ts
+                    task.completed_at_iso = task.completed_at.isoformat()
+                    self._publish(task)
+
+                task.log.info("completed successfully")
+
+            except Exception as e:
+                error_msg = str(e)
+                task.log.error("failed: %s", error_msg, exc_info=True)
+                end_ts = datetime.now(timezone.utc)
+
+                with task._lock:
+                    task.status = SyncStatus.FAILED
+                    # Keep full error internal; expose only a safe message to the client
+                    task.error = "Sync failed. Check your connection and try again."
+                    task.message = "Sync failed. Check your connection and try again."
+                    task.completed_at = end_ts
+                    task.completed_at_iso = task.completed_at.isoformat()
+                    self._publish(task)
+
+                # Save full error to metadata (server-side only)
+                self._save_sync_metadata(task_id, user_id, "failed", None, error_msg, end_ts=end_ts)
+        finally:
+            self._release_slot(task_id)
 
-                from scraper.canvas_client import CanvasClient
+    def _release_slot(self, task_id: str):
+        """Clear _current_task_id if it still points at this task."""
+        with self._task_lock:
+            if self._current_task_id == task_id:
+                self._current_task_id = None
 
-                def canvas_progress(current, total, course_name):
-                    with self._task_lock:
-                        task.current_course = current
-                        task.total_courses = total
-                        task.current_course_name = course_name
-                        task.message = f"Canvas: {course_name} ({current}/{total})" if current > 0 else f"Canvas: found {total} courses..."
-                    logger.info(f"Sync [{task_id[:8]}] - Canvas {current}/{total}: {course_name}")
+    def _run_canvas_sync(self, task: SyncTask, user_id: str, canvas_token: str) -> tuple[int, int, int]:
+        """Scrape Canvas and write to the DB.
 
-                try:
-                    canvas = CanvasClient(canvas_token)
-                    canvas_assignments = canvas.scrape_all_courses(progress_callback=canvas_progress)
-                    # Pass the service-role supabase client and user_id so RLS is bypassed
-                    canvas_result = canvas.update_database(
-                        canvas_assignments,
-                        supabase_client=self.supabase,
-                        user_id=user_id,
-                    )
+        Returns:
+            Tuple of (assignments_added, assignments_updated, courses_scraped)
+        """
+        log = task.log
+        log.info("Starting Canvas sync...")
+
+        # Courses are counted as their fetch succeeds, so there's no rescan of the results
+        scraped_courses: set[str] = set()
+        # Identical successive callbacks are dropped without touching the lock
+        last_progress = None
+
+        def canvas_progress(current, total, course_name):
+            nonlocal last_progress
+            if (current, total, course_name) == last_progress:
+                return
+            last_progress = (current, total, course_name)
+            with task._lock:
+                task.current_course = current
+                task.total_courses = total
+                task.current_course_name = f"Canvas: {course_name}" if course_name else ""
+                task.message = f"Canvas: {course_name} ({current}/{total})" if current > 0 else f"Canvas: found {total} courses..."
+                self._publish(task)
+            log.info("Canvas %d/%d: %s", current, total, course_name)
 
-                    with self._task_lock:
-                        task.assignments_added += canvas_result.get("new", 0)
-                        task.assignments_updated += canvas_result.get("modified", 0)
-                        canvas_courses = set(a.get("course_name") for a in canvas_assignments if a.get("course_name"))
-                        task.courses_scraped += len(canvas_courses)
-
-                    logger.info(f"Sync [{task_id[:8]}] - Canvas: {canvas_result}")
-                except Exception as e:
-                    logger.error(f"Sync [{task_id[:8]}] - Canvas sync error: {e}")
-                    raise
-
-            # ---- iCal feed sync ----
-            if has_ical_feeds:
-                self._update_task(task_id, SyncStatus.SCRAPING, "Syncing Learning Suite iCal feeds...")
-                from ical_client import fetch_and_parse, update_database as ical_update_database
-
-                ical_feeds_resp = self.supabase.table("ls_ical_feeds").select("*").eq(
-                    "user_id", user_id
-                ).execute()
-                ical_feeds = ical_feeds_resp.data or []
-                now_iso = datetime.now(timezone.utc).isoformat()
-
-                for feed in ical_feeds:
-                    try:
-                        with self._task_lock:
-                            task.message = f"iCal: {feed['course_name']}..."
-
-                        ical_assignments = fetch_and_parse(feed["url"], feed["course_name"])
-                        ical_result = ical_update_database(
-                            ical_assignments,
-                            supabase_client=self.supabase,
-                            user_id=user_id,
-                            feed_url=feed["url"],
-                        )
-
-                        with self._task_lock:
-                            task.assignments_added += ical_result.get("new", 0)
-                            task.assignments_updated += ical_result.get("modified", 0)
-                            task.courses_scraped += 1
-
-                        self.supabase.table("ls_ical_feeds").update(
-                            {"last_synced_at": now_iso}
-                        ).eq("id", feed["id"]).execute()
-
-                        logger.info(f"Sync [{task_id[:8]}] - iCal {feed['course_name']}: {ical_result}")
-                    except Exception as e:
-                        logger.error(f"Sync [{task_id[:8]}] - iCal feed {feed['id']} failed: {e}")
-                        with self._task_lock:
-                            task.warnings.append(f"iCal sync failed for {feed['course_name']}: {e}")
-
-            # Build result summary for metadata
-            result = {
-                "courses_scraped": task.courses_scraped,
-                "assignments_added": task.assignments_added,
-                "assignments_updated": task.assignments_updated,
-            }
+        try:
+            canvas = self._get_canvas_client(user_id, canvas_token)
+            canvas_assignments = canvas.scrape_all_courses(
+                progress_callback=canvas_progress,
+                course_done_callback=scraped_courses.add,
+            )
+            # Pass the service-role supabase client and user_id so RLS is bypassed
+            canvas_result = canvas.update_database(
+                canvas_assignments,
+                supabase_client=self.supabase,
+                user_id=user_id,
+            )
+            log.info("Canvas: %s", canvas_result)
+            return canvas_result.get("new", 0), canvas_result.get("modified", 0), len(scraped_courses)
+        except Exception as e:
+            log.error("Canvas sync error: %s", e)
+            self._drop_canvas_client(user_id)
+            raise
 
-            self._update_task(task_id, SyncStatus.UPDATING_DB, "Updating sync metadata...")
-            self._save_sync_metadata(task_id, user_id, "success", result)
+    def _get_canvas_client(self, user_id: str, canvas_token: str):
+        """Return the user's warm CanvasClient, rebuilding it if the token changed.
 
-            with self._task_lock:
-                task.status = SyncStatus.COMPLETED
-                task.message = f"Sync complete! {task.assignments_added} new, {task.assignments_updated} updated from {task.courses_scraped} courses."
-                task.completed_at = datetime.now(timezone.utc)
+        Clients are built and closed outside the lock; only the cache lookup and
+        swap happen under _canvas_clients_lock.
+        """
+        from scraper.canvas_client import CanvasClient
+
+        auth = f"Bearer {canvas_token}"
+        with self._canvas_clients_lock:
+            client = self._canvas_clients.get(user_id)
+            if client is not None and client.session.headers.get("Authorization") == auth:
+                self._canvas_clients.move_to_end(user_id)
+                return client
+
+        client = CanvasClient(canvas_token)
+        stale = []
+        with self._canvas_clients_lock:
+            old = self._canvas_clients.pop(user_id, None)
+            if old is not None:
+                stale.append(old)
+            self._canvas_clients[user_id] = client
+            while len(self._canvas_clients) > self.MAX_CANVAS_CLIENTS:
+                stale.append(self._canvas_clients.popitem(last=False)[1])
+        for old in stale:
+            old.session.close()
+        return client
+
+    def _drop_canvas_client(self, user_id: str):
+        """Discard a user's cached CanvasClient (e.g. after a failed sync)."""
+        with self._canvas_clients_lock:
+            client = self._canvas_clients.pop(user_id, None)
+        if client is not None:
+            client.session.close()
+
+    def _run_ical_sync(self, task: SyncTask, user_id: str, ical_feeds: list[dict]) -> tuple[int, int, int]:
+        """Fetch each of the user's saved LS iCal feeds and write to the DB.
+
+        Per-feed failures are recorded as task warnings rather than raised.
 
-            logger.info(f"Sync [{task_id[:8]}] completed successfully")
+        Returns:
+            Tuple of (assignments_added, assignments_updated, courses_scraped)
+        """
+        log = task.log
+        from ical_client import fetch_and_parse, update_database as ical_update_database
 
-        except Exception as e:
-            error_msg = str(e)
-            logger.error(f"Sync [{task_id[:8]}] failed: {error_msg}", exc_info=True)
+        now_iso = datetime.now(timezone.utc).isoformat()
+
+        added = updated = courses = 0
+        synced_feed_ids = []
+        for feed in ical_feeds:
+            try:
+                with task._lock:
+                    task.current_course_name = f"LS: {feed['course_name']}"
+                    task.message = f"iCal: {feed['course_name']}..."
+                    self._publish(task)
+
+                ical_assignments = fetch_and_parse(feed["url"], feed["course_name"])
+                ical_result = ical_update_database(
+                    ical_assignments,
+                    supabase_client=self.supabase,
+                    user_id=user_id,
+                    feed_url=feed["url"],
+                )
+                added += ical_result.get("new", 0)
+                updated += ical_result.get("modified", 0)
+                courses += 1
+                synced_feed_ids.append(feed["id"])
+
+                log.info("iCal %s: %s", feed["course_name"], ical_result)
+            except Exception as e:
+                log.error("iCal feed %s failed: %s", feed["id"], e)
+                with task._lock:
+                    task.warnings.append(f"iCal sync failed for {feed['course_name']}: {e}")
+                    self._publish(task)
+
+        # Stamp every successfully synced feed in one round-trip
+        if synced_feed_ids:
+            try:
+                self.supabase.table("ls_ical_feeds").update(
+                    {"last_synced_at": now_iso}
+                ).in_("id", synced_feed_ids).execute()
+            except Exception as e:
+                log.error("failed to update iCal last_synced_at: %s", e)
 
-            with self._task_lock:
-                task.status = SyncStatus.FAILED
-                # Keep full error internal; expose only a safe message to the client
-                task.error = "Sync failed. Check your connection and try again."
-                task.message = "Sync failed. Check your connection and try again."
-                task.completed_at = datetime.now(timezone.utc)
+        return added, updated, courses
 
-            # Save full error to metadata (server-side only)
-            self._save_sync_metadata(task_id, user_id, "failed", None, error_msg)
+    def _save_sync_metadata(self, task_id: str, user_id: str, status: str, result: Optional[dict],
+                            error: Optional[str] = None, end_ts: Optional[datetime] = None):
+        """Save sync result to the sync_metadata table.
 
-        finally:
-            with self._task_lock:
-                if self._current_task_id == task_id:
-                    self._current_task_id = None
+        The row is cached for get_last_sync immediately and buffered for a batched
+        insert (see _flush_sync_metadata), so the caller can mark the task finished
+        right away.
 
-    def _save_sync_metadata(self, task_id: str, user_id: str, status: str, result: Optional[dict], error: Optional[str] = None):
-        """Save sync result to the sync_metadata table."""
+        end_ts is the sync's completion time (matches task.completed_at); defaults to now.
+        """
         if not self.supabase:
             return
 
-        try:
-            summary = None
-            if result:
-                summary = {
-                    "courses_scraped": result.get("courses_scraped", 0),
-                    "assignments_added": result.get("assignments_added", 0),
-                    "assignments_updated": result.get("assignments_updated", 0),
-                }
+        summary = None
+        if result:
+            summary = {
+                "courses_scraped": result.get("courses_scraped", 0),
+                "assignments_added": result.get("assignments_added", 0),
+                "assignments_updated": result.get("assignments_updated", 0),
+            }
+
+        row = {
+            "user_id": user_id,
+            "last_sync_at": (end_ts or datetime.now(timezone.utc)).isoformat(),
+            "last_sync_status": status,
+            "last_sync_summary": summary,
+            "last_sync_error": error,
+        }
+        with self._last_sync_cache_lock:
+            self._cache_last_sync(user_id, row, pending=True)
+
+        with self._metadata_lock:
+            self._metadata_buffer.append(row)
+            if len(self._metadata_buffer) >= self.METADATA_BATCH_SIZE:
+                flush_now = True
+            else:
+                flush_now = False
+                # Timer starts with the first buffered row so no row waits longer
+                # than METADATA_FLUSH_SECONDS
+                if self._metadata_timer is None:
+                    self._metadata_timer = threading.Timer(
+                        self.METADATA_FLUSH_SECONDS, self._flush_sync_metadata
+                    )
+                    self._metadata_timer.daemon = True
+                    self._metadata_timer.start()
+
+        if flush_now:
+            self._metadata_pool.submit(self._flush_sync_metadata)
 
-            self.supabase.table("sync_metadata").insert({
-                "user_id": user_id,
-                "last_sync_at": datetime.now(timezone.utc).isoformat(),
-                "last_sync_status": status,
-                "last_sync_summary": summary,
-                "last_sync_error": error,
-            }).execute()
+    def _flush_sync_metadata(self):
+        """Insert all buffered sync_metadata rows in one request.
 
+        Runs on the sync-meta pool (batch full), the flush timer, or atexit.
+        """
+        with self._metadata_lock:
+            rows, self._metadata_buffer = self._metadata_buffer, []
+            if self._metadata_timer is not None:
+                self._metadata_timer.cancel()
+                self._metadata_timer = None
+        if not rows:
+            return
+
+        stored_rows = []
+        try:
+            response = self.supabase.table("sync_metadata").insert(rows).execute()
+            stored_rows = response.data or []
         except Exception as e:
-            logger.error(f"Error saving sync metadata: {e}")
+            logger.error(f"Error saving {len(rows)} sync metadata rows: {e}")
+
+        # Swap in the stored rows (with id/created_at) unless a newer sync replaced
+        # them; either way the cached entries now start expiring
+        with self._last_sync_cache_lock:
+            for i, row in enumerate(rows):
+                entry = self._last_sync_cache.get(row["user_id"])
+                if entry is not None and entry[1] is row:
+                    stored = stored_rows[i] if i < len(stored_rows) else row
+                    self._cache_last_sync(row["user_id"], stored)
 
 
 # Global sync service instance
@@ -12,41 +12,231 @@ Usage:
 
 import os
 import re
+import sys
 import argparse
-from bs4 import BeautifulSoup
+import soupsieve
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer
+from dataclasses import dataclass
 from datetime import datetime
 
 DEBUG_HTML_PATH = os.path.join(os.path.dirname(__file__), "debug.html")
 
-
-def load_debug_html():
-    """Load debug.html and return BeautifulSoup object."""
+# Data rows only: header/spacer rows without td cells are filtered by soupsieve
+# instead of being walked and skipped in Python
+DEFAULT_ROW_SELECTOR = "table tbody tr:has(> td)"
+
+# Candidates compared by test_row_selectors
+ROW_SELECTORS = (
+    DEFAULT_ROW_SELECTOR,
+    "table tr:has(> td)",
+    ".assignment-row",
+    ".gradebook-item",
+    ".exam-row",
+    ".exam-item",
+    "[class*='assignment']",
+    "[class*='gradebook']",
+    ".list-item",
+    ".item-row",
+)
+# Selectors used by analyze_page_structure
+STRUCTURE_SELECTORS = (
+    "table tbody tr",
+    ".assignment-row",
+    ".gradebook-item",
+    "[class*='assignment']",
+    ".item-row",
+    "tr",
+)
+
+# selector -> compiled soupsieve pattern. Built at import, so a bad built-in
+# selector fails immediately; ad-hoc ones (--selector/--dump) are added on first use.
+_COMPILED_SELECTORS = {sel: soupsieve.compile(sel) for sel in (*ROW_SELECTORS, *STRUCTURE_SELECTORS)}
+
+
+def _compiled(selector):
+    """Compiled soupsieve pattern for a CSS selector, compiled once per process."""
+    pattern = _COMPILED_SELECTORS.get(selector)
+    if pattern is None:
+        pattern = _COMPILED_SELECTORS[selector] = soupsieve.compile(selector)
+    return pattern
+
+
+# lxml builds the tree in C (much faster on large dumps); fall back to the
+# pure-Python parser when it isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Only these subtrees are built; everything else in the dump is skipped.
+# Tags/classes cover what the structure analysis and row selectors look at.
+_KEEP_TAGS = frozenset({"iframe", "table", "tbody", "tr", "td", "a"})
+_KEEP_CLASS_HINTS = ("assignment", "gradebook", "exam-", "list-item", "item-row")
+
+
+def _keep_tag(name, attrs):
+    """Keep tags (and their subtrees) the parser inspects."""
+    if name in _KEEP_TAGS or "shadowroot" in attrs:
+        return True
+    classes = attrs.get("class") or ""
+    if not isinstance(classes, str):
+        classes = " ".join(classes)
+    return any(hint in classes for hint in _KEEP_CLASS_HINTS)
+
+
+class _RelevantTagStrainer(SoupStrainer):
+    """SoupStrainer that keeps a tag when its name OR class matches.
+
+    Plain SoupStrainer arguments AND name and attribute rules together, and a
+    name function only receives the tag name on bs4 >= 4.13. So this overrides
+    the tag-creation hook of each API instead.
+    """
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        # bs4 < 4.13
+        return _keep_tag(markup_name, markup_attrs or {})
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        # bs4 >= 4.13
+        return _keep_tag(name, attrs or {})
+
+
+PARSE_ONLY = _RelevantTagStrainer()
+
+# Cell classifier for extract_assignments: one search tells which kind of cell it
+# is. Alternatives are tried in the old check order (score, grade, date, month);
+# only the month names are case-insensitive.
+_CELL_RE = re.compile(
+    r'^(?P<score>\d+(?:\.\d+)?(?:/\d+)?%?)$'
+    r'|^(?P<grade>[A-F][+-]?)$'
+    r'|^(?P<date>\d{1,2}/\d{1,2})'
+    r'|(?P<month>(?i:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec))'
+)
+# Cell kind -> what it tells us about the row
+_CELL_KIND = {"score": "score", "grade": "score", "date": "due_date", "month": "due_date"}
+# Month names on their own, for cells that can't be a score, grade or numeric date
+_MONTH_RE = re.compile(r'(?i:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)')
+_GRADE_SUFFIXES = ("", "+", "-")
+_DATE_RE = re.compile(r'^\d{1,2}/\d{1,2}')
+
+# Action-button labels that are never assignment titles
+_BUTTON_WORDS = frozenset({'view', 'submit', 'begin', 'continue', 'open', 'completed',
+                           'unavailable', 'closed', 'resubmit', 'view/submit', 'go',
+                           'take', 'start', 'resume', 'graded'})
+_MAX_BUTTON_WORD_LEN = max(map(len, _BUTTON_WORDS))
+
+
+def _classify_cell(cell_text):
+    """Return "score", "due_date" or None for a non-empty cell.
+
+    Same result as searching _CELL_RE, but gated on the first character: only
+    digit-led cells can be a score or numeric date, a grade is at most two
+    characters, and anything else can only match on a month name.
+    """
+    c0 = cell_text[0]
+    if c0.isdigit():
+        m = _CELL_RE.search(cell_text)
+        return _CELL_KIND[m.lastgroup] if m else None
+    if len(cell_text) <= 2:
+        # Too short to hold a month name
+        return "score" if c0 in "ABCDEF" and cell_text[1:] in _GRADE_SUFFIXES else None
+    return "due_date" if _MONTH_RE.search(cell_text) else None
+
+
+def _button_key(text):
+    """Lowercased text for button-word lookups, or "" when it can't be one.
+
+    Button words are short and start with a letter, so longer or digit-led text
+    (titles, scores, dates) skips the lowercase copy entirely.
+    """
+    if len(text) <= _MAX_BUTTON_WORD_LEN and text[:1].isalpha():
+        return text.lower()
+    return ""
+
+
+# Metadata comments written by the scraper's debug dump (fixed prefixes, so a
+# plain bytes find over the raw file is enough)
+_URL_META = b"<!-- URL: "
+_TIME_META = b"<!-- TIME: "
+_LABEL_META = b"<!-- DEBUG DUMP: "
+_META_END = b" -->"
+
+
+def _meta(buf, prefix):
+    """Value of the first `<prefix>value -->` comment in buf, or 'N/A'."""
+    i = buf.find(prefix)
+    if i < 0:
+        return "N/A"
+    start = i + len(prefix)
+    end = buf.find(_META_END, start)
+    if end <= start:
+        return "N/A"
+    return buf[start:end].decode("utf-8", "replace")
+
+
+@dataclass(slots=True)
+class Assignment:
+    """One assignment parsed from a debug.html row."""
+    title: str
+    button_text: str = ""
+    due_date: str | None = None
+    has_score: bool = False
+    url: str | None = None
+
+
+def _text(el):
+    """el.get_text(strip=True), without the descendant walk for single-string elements."""
+    s = el.string
+    if type(s) is NavigableString:
+        return s.strip()
+    return el.get_text(strip=True)
+
+
+def _select(soup, selector, cache=None):
+    """soup.select() via the precompiled pattern, reusing an earlier result for the same selector.
+
+    The tree isn't modified after loading, so main() shares one cache dict across
+    the analysis steps and overlapping selectors only walk the tree once.
+    """
+    if cache is None:
+        return _compiled(selector).select(soup)
+    if selector not in cache:
+        cache[selector] = _compiled(selector).select(soup)
+    return cache[selector]
+
+
+def load_debug_html(parse_only=PARSE_ONLY):
+    """Load debug.html and return BeautifulSoup object.
+
+    By default only the subtrees the built-in analysis looks at are built; pass
+    parse_only=None to parse the whole page (needed for ad-hoc selectors).
+    """
     if not os.path.exists(DEBUG_HTML_PATH):
         print(f"ERROR: {DEBUG_HTML_PATH} not found!")
         print("Run the scraper first to generate this file.")
         return None
 
-    with open(DEBUG_HTML_PATH, "r", encoding="utf-8") as f:
+    # Read raw bytes: the metadata lookups run over them and the parser does the
+    # only decode (from_encoding skips charset sniffing)
+    with open(DEBUG_HTML_PATH, "rb") as f:
         html = f.read()
 
-    # Extract metadata from comments
-    url_match = re.search(r'<!-- URL: (.+?) -->', html)
-    time_match = re.search(r'<!-- TIME: (.+?) -->', html)
-    label_match = re.search(r'<!-- DEBUG DUMP: (.+?) -->', html)
-
     print("=" * 70)
     print("DEBUG HTML LOADED")
     print(f"  File: {DEBUG_HTML_PATH}")
-    print(f"  Label: {label_match.group(1) if label_match else 'N/A'}")
-    print(f"  URL: {url_match.group(1) if url_match else 'N/A'}")
-    print(f"  Time: {time_match.group(1) if time_match else 'N/A'}")
+    print(f"  Label: {_meta(html, _LABEL_META)}")
+    print(f"  URL: {_meta(html, _URL_META)}")
+    print(f"  Time: {_meta(html, _TIME_META)}")
     print(f"  Size: {len(html):,} bytes")
+    print(f"  Parser: {HTML_PARSER}")
+    print(f"  Filtered: {'yes' if parse_only is not None else 'no (full parse)'}")
     print("=" * 70)
 
-    return BeautifulSoup(html, "html.parser")
+    return BeautifulSoup(html, HTML_PARSER, from_encoding="utf-8", parse_only=parse_only)
 
 
-def analyze_page_structure(soup, verbose=False):
+def analyze_page_structure(soup, verbose=False, cache=None):
     """Analyze the DOM structure of the page."""
     print("\n>>> PAGE STRUCTURE ANALYSIS")
     print("-" * 50)
@@ -76,86 +266,59 @@ def analyze_page_structure(soup, verbose=False):
     # Check for common assignment container patterns
     print(f"\nCommon container patterns:")
     patterns = [
-        ("table tbody tr", soup.select("table tbody tr")),
-        (".assignment-row", soup.select(".assignment-row")),
-        (".gradebook-item", soup.select(".gradebook-item")),
-        ("[class*='assignment']", soup.select("[class*='assignment']")),
-        (".item-row", soup.select(".item-row")),
-        ("tr[data-*]", soup.find_all("tr", attrs=lambda x: x and any(k.startswith("data-") for k in x.keys()) if x else False)),
+        ("table tbody tr", _select(soup, "table tbody tr", cache)),
+        (".assignment-row", _select(soup, ".assignment-row", cache)),
+        (".gradebook-item", _select(soup, ".gradebook-item", cache)),
+        ("[class*='assignment']", _select(soup, "[class*='assignment']", cache)),
+        (".item-row", _select(soup, ".item-row", cache)),
+        ("tr[data-*]", [tr for tr in _select(soup, "tr", cache) if any(k[:5] == "data-" for k in tr.attrs)]),
     ]
     for name, elements in patterns:
         print(f"  {name}: {len(elements)} elements")
 
 
-def test_row_selectors(soup, verbose=False):
+def test_row_selectors(soup, verbose=False, cache=None):
     """Test various CSS selectors to find assignment rows."""
     print("\n>>> TESTING ROW SELECTORS")
     print("-" * 50)
 
-    selectors = [
-        "table tbody tr",
-        "table tr",
-        ".assignment-row",
-        ".gradebook-item",
-        ".exam-row",
-        ".exam-item",
-        "[class*='assignment']",
-        "[class*='gradebook']",
-        ".list-item",
-        ".item-row",
-    ]
-
     best_selector = None
     best_count = 0
 
-    for selector in selectors:
-        try:
-            elements = soup.select(selector)
-            count = len(elements)
-            if count > 0:
-                print(f"  '{selector}': {count} elements")
-                if verbose and count > 0 and count <= 20:
-                    for i, el in enumerate(elements[:3]):
-                        text = el.get_text(strip=True)[:100]
-                        print(f"    [{i}] {text}...")
-                if count > best_count:
-                    best_count = count
-                    best_selector = selector
-        except Exception as e:
-            print(f"  '{selector}': ERROR - {e}")
+    for selector in ROW_SELECTORS:
+        elements = _select(soup, selector, cache)
+        count = len(elements)
+        if count > 0:
+            print(f"  '{selector}': {count} elements")
+            if verbose and count > 0 and count <= 20:
+                for i, el in enumerate(elements[:3]):
+                    text = _text(el)[:100]
+                    print(f"    [{i}] {text}...")
+            if count > best_count:
+                best_count = count
+                best_selector = selector
 
     print(f"\n  BEST SELECTOR: '{best_selector}' with {best_count} elements")
     return best_selector
 
 
-def extract_assignments(soup, selector="table tbody tr", verbose=False):
-    """Extract assignments using the given selector."""
-    print(f"\n>>> EXTRACTING ASSIGNMENTS (selector: '{selector}')")
-    print("-" * 50)
-
-    rows = soup.select(selector)
-    print(f"Found {len(rows)} rows to parse\n")
-
-    button_words = {'view', 'submit', 'begin', 'continue', 'open', 'completed',
-                   'unavailable', 'closed', 'resubmit', 'view/submit', 'go',
-                   'take', 'start', 'resume', 'graded'}
-
-    assignments = []
-
+def iter_assignments(rows, verbose=False):
+    """Parse assignment rows, yielding an Assignment for each one as it's found."""
     for i, row in enumerate(rows):
         if verbose:
             print(f"--- Row {i+1} ---")
 
-        # Get row text
-        row_text = row.get_text(strip=True)
-        if not row_text:
+        # Get cells (direct td children; avoids a recursive find_all per row)
+        cells = [c for c in row.contents if c.name == "td"]
+
+        # Row text is only needed for verbose output and the non-table fallback;
+        # table rows with no text simply yield no title below
+        row_text = _text(row) if verbose or not cells else None
+        if row_text == "":
             if verbose:
                 print("  [SKIP] Empty row")
             continue
 
-        # Get cells
-        cells = row.find_all("td")
-
         title = None
         button_text = ""
         due_date = None
@@ -168,62 +331,56 @@ def extract_assignments(soup, selector="table tbody tr", verbose=False):
 
         if cells:
             for j, cell in enumerate(cells):
-                cell_text = cell.get_text(strip=True)
-                cell_lower = cell_text.lower()
+                cell_text = _text(cell)
 
                 if verbose:
                     print(f"    Cell[{j}]: '{cell_text[:60]}...' " if len(cell_text) > 60 else f"    Cell[{j}]: '{cell_text}'")
 
                 if not cell_text:
                     continue
+                cell_lower = _button_key(cell_text)
 
                 # Check for unavailable
-                if cell_lower == 'unavailable' or cell_lower.startswith('opens'):
+                if cell_lower == 'unavailable' or cell_text[:5].lower() == 'opens':
                     button_text = cell_text
                     continue
 
                 # Check for button/link
                 link = cell.find("a")
                 if link:
-                    link_text = link.get_text(strip=True).lower()
-                    if link_text in button_words or link_text.startswith('opens'):
-                        button_text = link.get_text(strip=True)
+                    link_label = _text(link)
+                    if _button_key(link_label) in _BUTTON_WORDS or link_label[:5].lower() == 'opens':
+                        button_text = link_label
                         assignment_url = link.get("href")
                         continue
 
                 # Check if cell is button word
-                if cell_lower in button_words:
+                if cell_lower in _BUTTON_WORDS:
                     button_text = cell_text
                     continue
 
-                # Check for score
-                if re.match(r'^\d+(\.\d+)?(/\d+)?%?$', cell_text) or re.match(r'^[A-F][+-]?$', cell_text):
+                # Check for score or date
+                kind = _classify_cell(cell_text)
+                if kind == "score":
                     has_score = True
                     continue
-
-                # Check for date
-                if re.match(r'^\d{1,2}/\d{1,2}', cell_text):
-                    due_date = cell_text
-                    continue
-
-                month_pattern = r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)'
-                if re.search(month_pattern, cell_text, re.IGNORECASE):
+                if kind == "due_date":
                     due_date = cell_text
                     continue
 
                 # Otherwise it's probably the title
-                if not title and cell_lower not in button_words:
+                if not title and cell_lower not in _BUTTON_WORDS:
                     title = cell_text
 
         else:
-            # Non-table row - parse from text
+            # Non-table row (e.g. a div-based selector) - parse from text
             parts = [p.strip() for p in row_text.split('\n') if p.strip()]
             for part in parts:
                 part_lower = part.lower()
-                if part_lower in button_words:
+                if part_lower in _BUTTON_WORDS:
                     button_text = part
-                elif not title and part_lower not in button_words:
-                    if not re.match(r'^\d{1,2}/\d{1,2}', part):
+                elif not title and part_lower not in _BUTTON_WORDS:
+                    if not _DATE_RE.match(part):
                         title = part
 
         # Get URL if not found
@@ -233,37 +390,49 @@ def extract_assignments(soup, selector="table tbody tr", verbose=False):
                 assignment_url = link.get("href")
 
         # Validate and add
-        if title and title.lower() not in button_words and len(title) >= 3:
-            assignment = {
-                "title": title,
-                "button_text": button_text,
-                "due_date": due_date,
-                "has_score": has_score,
-                "url": assignment_url,
-            }
-            assignments.append(assignment)
+        if title and title.lower() not in _BUTTON_WORDS and len(title) >= 3:
+            assignment = Assignment(
+                title=title,
+                button_text=button_text,
+                due_date=due_date,
+                has_score=has_score,
+                url=assignment_url,
+            )
 
             if verbose:
                 print(f"  -> EXTRACTED: {assignment}")
+            yield assignment
         elif verbose:
             print(f"  [SKIP] No valid title")
 
-    print(f"\n>>> EXTRACTION COMPLETE: {len(assignments)} assignments found")
+
+def extract_assignments(soup, selector=DEFAULT_ROW_SELECTOR, verbose=False, cache=None):
+    """Extract assignments using the given selector."""
+    print(f"\n>>> EXTRACTING ASSIGNMENTS (selector: '{selector}')")
     print("-" * 50)
 
-    for a in assignments:
-        status = "submitted" if a["has_score"] else ("unavailable" if "unavailable" in a["button_text"].lower() else "not_started")
-        print(f"  - {a['title'][:50]:<50} | {a['button_text']:<15} | {status}")
+    rows = _select(soup, selector, cache)
+    print(f"Found {len(rows)} rows to parse\n")
+
+    # Summary lines are printed as each assignment is parsed (single pass)
+    assignments = []
+    for a in iter_assignments(rows, verbose):
+        assignments.append(a)
+        status = "submitted" if a.has_score else ("unavailable" if "unavailable" in a.button_text.lower() else "not_started")
+        print(f"  - {a.title[:50]:<50} | {a.button_text:<15} | {status}")
+
+    print(f"\n>>> EXTRACTION COMPLETE: {len(assignments)} assignments found")
+    print("-" * 50)
 
     return assignments
 
 
-def dump_raw_html_section(soup, selector, limit=2):
+def dump_raw_html_section(soup, selector, limit=2, cache=None):
     """Dump raw HTML for a selector to see actual structure."""
     print(f"\n>>> RAW HTML DUMP (selector: '{selector}', limit: {limit})")
     print("-" * 50)
 
-    elements = soup.select(selector)
+    elements = _select(soup, selector, cache)
     for i, el in enumerate(elements[:limit]):
         print(f"\n--- Element {i+1} HTML ---")
         html = str(el)
@@ -278,26 +447,43 @@ def main():
     parser = argparse.ArgumentParser(description="Test parser on debug.html")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--dump", "-d", type=str, help="Dump raw HTML for a selector")
-    parser.add_argument("--selector", "-s", type=str, default="table tbody tr", help="CSS selector to use")
+    parser.add_argument("--selector", "-s", type=str, default=DEFAULT_ROW_SELECTOR, help="CSS selector to use")
     args = parser.parse_args()
 
-    soup = load_debug_html()
+    # Compile user-supplied selectors up front so a typo is a one-line error,
+    # not a soupsieve traceback after the page has been parsed
+    for user_selector in (args.selector, args.dump):
+        if not user_selector:
+            continue
+        try:
+            _compiled(user_selector)
+        except (soupsieve.SelectorSyntaxError, ValueError, NotImplementedError) as e:
+            print(f"ERROR: invalid selector {user_selector!r}: {str(e).splitlines()[0]}")
+            sys.exit(1)
+
+    # --dump and a custom --selector can target any tag, so those runs parse the
+    # full page; the tag filter only covers what the built-in analysis selects
+    full_parse = bool(args.dump) or args.selector != DEFAULT_ROW_SELECTOR
+    soup = load_debug_html(parse_only=None if full_parse else PARSE_ONLY)
     if not soup:
         return
 
+    # selector -> elements, shared by every step below
+    select_cache = {}
+
     # Analyze page structure
-    analyze_page_structure(soup, args.verbose)
+    analyze_page_structure(soup, args.verbose, select_cache)
 
     # Test row selectors
-    best_selector = test_row_selectors(soup, args.verbose)
+    best_selector = test_row_selectors(soup, args.verbose, select_cache)
 
     # Dump raw HTML if requested
     if args.dump:
-        dump_raw_html_section(soup, args.dump)
+        dump_raw_html_section(soup, args.dump, cache=select_cache)
 
     # Extract using specified or best selector
-    selector = args.selector if args.selector != "table tbody tr" else (best_selector or "table tbody tr")
-    extract_assignments(soup, selector, args.verbose)
+    selector = args.selector if args.selector != DEFAULT_ROW_SELECTOR else (best_selector or DEFAULT_ROW_SELECTOR)
+    extract_assignments(soup, selector, args.verbose, select_cache)
 
 
 if __name__ == "__main__":
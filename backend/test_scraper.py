@@ -12,6 +12,7 @@ Make sure to set BYU_NETID and BYU_PASSWORD in your .env file before running.
 import os
 import sys
 import logging
+from collections import Counter, defaultdict
 from dotenv import load_dotenv
 
 # Force unbuffered output for real-time logging
@@ -22,6 +23,15 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from scraper.learning_suite_scraper import LearningSuiteScraper
 
+# Marker shown before each assignment in the per-course listing
+_STATUS_MARKER = {
+    'submitted': '✓',
+    'in_progress': '◐',
+    'not_started': '○',
+    'unavailable': '✗',
+    'newly_assigned': '★'
+}
+
 def main():
     load_dotenv()
 
@@ -93,60 +103,57 @@ def main():
 
             # Show ALL assignments grouped by course
             if result["assignments"]:
-                print("\n" + "-" * 60)
-                print("ALL ASSIGNMENTS BY COURSE:")
-                print("-" * 60)
-
-                # Group by course
-                by_course = {}
+                # Group by course and count statuses in one pass
+                by_course = defaultdict(list)
+                status_counts = defaultdict(Counter)
                 for assignment in result["assignments"]:
                     course = assignment['course_name']
-                    if course not in by_course:
-                        by_course[course] = []
                     by_course[course].append(assignment)
+                    status_counts[course][assignment['status']] += 1
+
+                # The whole report is built as lines and printed once; stdout is
+                # line-buffered, so a print per line would flush on every line
+                report = ["", "-" * 60, "ALL ASSIGNMENTS BY COURSE:", "-" * 60]
 
                 for course_name, assignments in by_course.items():
-                    print(f"\n{'='*60}")
-                    print(f"COURSE: {course_name}")
-                    print(f"{'='*60}")
-
-                    # Group by status for summary
-                    status_counts = {}
-                    for a in assignments:
-                        s = a['status']
-                        status_counts[s] = status_counts.get(s, 0) + 1
-
-                    print(f"Status summary: {status_counts}")
-                    print()
-
-                    for i, assignment in enumerate(assignments):
-                        status_marker = {
-                            'submitted': '✓',
-                            'in_progress': '◐',
-                            'not_started': '○',
-                            'unavailable': '✗',
-                            'newly_assigned': '★'
-                        }.get(assignment['status'], '?')
-
-                        print(f"  {status_marker} {assignment['title']}")
-                        print(f"      Button: '{assignment.get('button_text', 'N/A')}' -> Status: {assignment['status']}")
-                        if assignment.get('due_date'):
-                            print(f"      Due: {assignment['due_date']}")
+                    report.extend((
+                        "",
+                        "=" * 60,
+                        f"COURSE: {course_name}",
+                        "=" * 60,
+                        f"Status summary: {dict(status_counts[course_name])}",
+                        "",
+                    ))
+                    for assignment in assignments:
+                        # Each field is looked up once per assignment
+                        status = assignment['status']
+                        due_date = assignment.get('due_date')
+                        report.append(f"  {_STATUS_MARKER.get(status, '?')} {assignment['title']}")
+                        report.append(f"      Button: '{assignment.get('button_text', 'N/A')}' -> Status: {status}")
+                        if due_date:
+                            report.append(f"      Due: {due_date}")
 
                 # FINAL TOTALS COMPARISON
-                print("\n" + "=" * 60)
-                print("FINAL TOTALS BY COURSE (for comparison)")
-                print("=" * 60)
-                print(f"{'Course':<40} {'Scraped':>10}")
-                print("-" * 60)
-                for course_name in sorted(by_course.keys()):
+                report.extend((
+                    "",
+                    "=" * 60,
+                    "FINAL TOTALS BY COURSE (for comparison)",
+                    "=" * 60,
+                    f"{'Course':<40} {'Scraped':>10}",
+                    "-" * 60,
+                ))
+                for course_name in sorted(by_course):
                     count = len(by_course[course_name])
                     # Extract short course code
                     short_name = course_name.split(' - ')[0] if ' - ' in course_name else course_name
-                    print(f"{short_name:<40} {count:>10}")
-                print("-" * 60)
-                print(f"{'TOTAL':<40} {len(result['assignments']):>10}")
-                print("=" * 60)
+                    report.append(f"{short_name:<40} {count:>10}")
+                report.extend((
+                    "-" * 60,
+                    f"{'TOTAL':<40} {len(result['assignments']):>10}",
+                    "=" * 60,
+                ))
+
+                print("\n".join(report))
 
         else:
             print(f"\n✗ Scraping failed: {result.get('error', 'Unknown error')}")
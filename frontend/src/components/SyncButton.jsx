@@ -2,7 +2,7 @@ import { useState, useEffect, useCallback } from 'react'
 import { authFetch, API_BASE } from '../lib/api'
 import './SyncButton.css'
 
-const POLL_INTERVAL = 3000
+const RECONNECT_DELAY = 3000
 const STALE_THRESHOLD = 24 * 60 * 60 * 1000
 
 const STATUS_MESSAGES = {
@@ -37,85 +37,127 @@ function SyncButton({ onSyncComplete, triggerSync, onSyncStarted, onSyncProgress
   useEffect(() => {
     if (!taskId || !syncing) return
 
-    let pollFailCount = 0
-    const MAX_POLL_FAILURES = 3
-
-    const pollStatus = async () => {
-      const url = `${API_BASE}/sync/status/${taskId}`
-      try {
-        const response = await authFetch(url)
-
-        if (!response.ok) {
-          let errorDetail = `HTTP ${response.status}`
-          try {
-            const data = await response.json()
-            errorDetail = data.detail || errorDetail
-          } catch {
-            // Not JSON
-          }
+    const controller = new AbortController()
+    let streamFailCount = 0
+    const MAX_STREAM_FAILURES = 3
+    let finished = false
 
-          pollFailCount++
-          if (pollFailCount >= MAX_POLL_FAILURES) {
-            setError(`Status check failed: ${errorDetail}`)
-            setSyncing(false)
-            setTaskId(null)
-            if (onSyncComplete) {
-              onSyncComplete()
-            }
-          }
-          return
-        }
+    const giveUp = (message) => {
+      finished = true
+      setError(message)
+      setSyncing(false)
+      setTaskId(null)
+      if (onSyncComplete) {
+        onSyncComplete()
+      }
+    }
 
-        // Reset failure count on success
-        pollFailCount = 0
+    const handleStatus = (data) => {
+      setStatus(data)
 
-        const data = await response.json()
-        setStatus(data)
+      if (onSyncProgress) {
+        onSyncProgress(data)
+      }
 
-        if (onSyncProgress) {
-          onSyncProgress(data)
+      if (data.status === 'completed') {
+        finished = true
+        setSyncing(false)
+        setTaskId(null)
+        fetchLastSync()
+        if (data.warnings && data.warnings.length > 0) {
+          let warningText = data.warnings.join(' ')
+          if (/session expired|reconnect/i.test(warningText)) {
+            warningText += ' → Go to Settings to reconnect.'
+          }
+          setWarning(warningText)
         }
+        if (onSyncComplete) {
+          onSyncComplete(data)
+        }
+      } else if (data.status === 'failed') {
+        finished = true
+        setSyncing(false)
+        setTaskId(null)
+        setError(data.error || 'Sync failed')
+        if (onSyncComplete) {
+          onSyncComplete(data)
+        }
+      }
+    }
 
-        if (data.status === 'completed') {
-          setSyncing(false)
-          setTaskId(null)
-          fetchLastSync()
-          if (data.warnings && data.warnings.length > 0) {
-            let warningText = data.warnings.join(' ')
-            if (/session expired|reconnect/i.test(warningText)) {
-              warningText += ' → Go to Settings to reconnect.'
+    // Server pushes a status event on every change (SSE); reconnect if the
+    // stream drops before the task finishes — it re-sends the current status.
+    const streamStatus = async () => {
+      while (!finished && !controller.signal.aborted) {
+        try {
+          const response = await authFetch(`${API_BASE}/sync/stream/${taskId}`, {
+            signal: controller.signal,
+          })
+
+          if (!response.ok || !response.body) {
+            let errorDetail = `HTTP ${response.status}`
+            try {
+              const data = await response.json()
+              errorDetail = data.detail || errorDetail
+            } catch {
+              // Not JSON
+            }
+            streamFailCount++
+            if (streamFailCount >= MAX_STREAM_FAILURES) {
+              giveUp(`Status check failed: ${errorDetail}`)
+              return
             }
-            setWarning(warningText)
+            await new Promise((resolve) => setTimeout(resolve, RECONNECT_DELAY))
+            continue
           }
-          if (onSyncComplete) {
-            onSyncComplete(data)
+
+          const reader = response.body.getReader()
+          const decoder = new TextDecoder()
+          let buffer = ''
+
+          while (!finished) {
+            const { done, value } = await reader.read()
+            if (done) break
+
+            buffer += decoder.decode(value, { stream: true })
+            const lines = buffer.split('\n')
+            buffer = lines.pop() // keep incomplete last line
+
+            for (const line of lines) {
+              if (!line.startsWith('data: ')) continue
+              try {
+                handleStatus(JSON.parse(line.slice(6)))
+                // Reset failure count on success
+                streamFailCount = 0
+              } catch { /* malformed SSE line — skip */ }
+            }
           }
-        } else if (data.status === 'failed') {
-          setSyncing(false)
-          setTaskId(null)
-          setError(data.error || 'Sync failed')
-          if (onSyncComplete) {
-            onSyncComplete(data)
+
+          // Stream closed before a terminal status — back off, then reconnect
+          if (!finished) {
+            streamFailCount++
+            if (streamFailCount >= MAX_STREAM_FAILURES) {
+              giveUp('Lost connection to sync status stream')
+              return
+            }
+            await new Promise((resolve) => setTimeout(resolve, RECONNECT_DELAY))
           }
-        }
-      } catch (err) {
-        console.error('[SyncButton] Error polling status:', err.message)
-        pollFailCount++
-        if (pollFailCount >= MAX_POLL_FAILURES) {
-          setError(`Cannot reach backend: ${err.message}`)
-          setSyncing(false)
-          setTaskId(null)
-          if (onSyncComplete) {
-            onSyncComplete()
+        } catch (err) {
+          if (controller.signal.aborted) return
+          console.error('[SyncButton] Error streaming status:', err.message)
+          streamFailCount++
+          if (streamFailCount >= MAX_STREAM_FAILURES) {
+            giveUp(`Cannot reach backend: ${err.message}`)
+            return
           }
+          await new Promise((resolve) => setTimeout(resolve, RECONNECT_DELAY))
         }
       }
     }
 
-    const interval = setInterval(pollStatus, POLL_INTERVAL)
-    pollStatus()
+    streamStatus()
 
-    return () => clearInterval(interval)
+    return () => controller.abort()
   }, [taskId, syncing, onSyncComplete]) // eslint-disable-line react-hooks/exhaustive-deps
 
   const fetchLastSync = async () => {